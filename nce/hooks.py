@@ -49,13 +49,21 @@ app_include_css = "/assets/nce/css/nce_theme.css"
 # Document Events
 # ---------------
 # Hook on document methods and events
-# doc_events = {
-#     "*": {
-#         "on_update": "method",
-#         "on_cancel": "method",
-#         "on_trash": "method"
-#     }
-# }
+# Drop the Layout Editor's cached JSON when a DocType or its customizations change
+doc_events = {
+    "DocType": {
+        "on_update": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache",
+        "on_trash": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache"
+    },
+    "Property Setter": {
+        "on_update": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache",
+        "on_trash": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache"
+    },
+    "Custom Field": {
+        "on_update": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache",
+        "on_trash": "nce.wp_sync.doctype.layout_editor.layout_editor.clear_layout_json_cache"
+    }
+}
 
 # Scheduled Tasks
 # ---------------
@@ -0,0 +1,54 @@
+"""
+Move WP Sync Task.field_mapping (JSON) into the WP Sync Task Field Map child table.
+
+The old column is left in place (Frappe doesn't drop columns of removed
+fields), so it is read straight from the table.
+"""
+
+import json
+
+import frappe
+
+
+def execute():
+    frappe.reload_doc("wp_sync", "doctype", "wp_sync_task_field_map")
+    frappe.reload_doc("wp_sync", "doctype", "wp_sync_task")
+
+    if not frappe.db.has_column("WP Sync Task", "field_mapping"):
+        return
+
+    tasks = frappe.db.sql(
+        """
+        SELECT name, field_mapping, source_primary_key
+        FROM `tabWP Sync Task`
+        WHERE IFNULL(field_mapping, '') != ''
+        """,
+        as_dict=True
+    )
+
+    for task in tasks:
+        if frappe.db.exists("WP Sync Task Field Map", {"parent": task.name, "parenttype": "WP Sync Task"}):
+            continue
+
+        try:
+            mapping = json.loads(task.field_mapping)
+        except ValueError:
+            frappe.log_error(
+                title="WP Sync Field Mapping Migration",
+                message=f"Skipped {task.name}: invalid JSON in field_mapping"
+            )
+            continue
+        if not isinstance(mapping, dict):
+            continue
+
+        doc = frappe.get_doc("WP Sync Task", task.name)
+        for wp_column, frappe_field in mapping.items():
+            doc.append("field_map", {
+                "wp_column": wp_column,
+                "frappe_field": frappe_field,
+                # Key was the column mapped to the tracking id field
+                "is_key": 0 if task.source_primary_key else int(frappe_field in ("track_record_id", "record_id")),
+                "skip_if_null": 1
+            })
+        doc.flags.ignore_validate = True
+        doc.save(ignore_permissions=True)
@@ -30,8 +30,8 @@ class LayoutEditorDataManager {
                 callback: (response) => {
                     if (response.message) {
                         try {
-                            // Parse the JSON response
-                            this.rawFields = JSON.parse(response.message.fields_json);
+                            // Fields arrive as structured data, no re-parse needed
+                            this.rawFields = response.message.fields;
                             this.doctype = doctypeName;
                             
                             // Build structure
@@ -6,32 +6,101 @@ Whitelisted API methods for manual sync triggers and status checks.
 
 import frappe
 from frappe import _
+from frappe.utils import cint
 import re
 import os
 import subprocess
 from datetime import datetime
+from collections import defaultdict
+from functools import lru_cache
 from nce import __version__, MAJOR_VERSION
+from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import (
+    execute_wp_query, get_wp_settings
+)
+from nce.wp_sync.tasks import run_scheduled_sync, run_single_task, run_tasks_parallel
+
+
+# Patterns used per column when mapping MySQL types to Frappe fieldtypes
+_QUOTED_VALUE_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+
+# Frappe field types offered in the mirror DocType preview dropdown
+MIRROR_FIELD_TYPES = (
+    "Data", "Int", "Float", "Check", "Date", "Datetime",
+    "Time", "Text", "Small Text", "Select", "JSON", "Link",
+    "Currency", "Percent", "Rating", "Color", "Password"
+)
+
+# Function-based column defaults that must not be copied into DocType defaults
+_AUTO_DEFAULTS = frozenset({'CURRENT_TIMESTAMP', 'NOW()', 'CURRENT_DATE', 'CURRENT_TIME', 'UUID()'})
+
+# Base types whose fieldtype depends on the declared length
+_STRING_TYPES = frozenset({'varchar', 'char'})
+
+# WordPress table/view names we accept, optionally schema-qualified
+# ("schema.table"); anything else is rejected outright
+_TABLE_NAME_RE = re.compile(r'(?:[A-Za-z0-9_]{1,64}\.)?[A-Za-z0-9_]{1,64}')
+
+# WP table structure rarely changes, so column lookups are cached briefly
+_WP_COLUMNS_CACHE_KEY = "nce:wp_cols:{0}"
+_WP_COLUMNS_CACHE_TTL = 300  # seconds
+
+# MySQL base type -> Frappe fieldtype (varchar/char and tinyint(1) are
+# special-cased in mysql_type_to_frappe_fieldtype)
+_MYSQL_TO_FRAPPE_FIELDTYPE = {
+    # Integer types
+    'int': "Int", 'integer': "Int", 'bigint': "Int",
+    'mediumint': "Int", 'smallint': "Int", 'tinyint': "Int",
+    # Decimal/Float types
+    'decimal': "Float", 'numeric': "Float", 'float': "Float",
+    'double': "Float", 'real': "Float",
+    # Text types
+    'text': "Text", 'mediumtext': "Text", 'longtext': "Text",
+    'tinytext': "Small Text",
+    # Date/Time types
+    'date': "Date", 'datetime': "Datetime", 'timestamp': "Datetime",
+    'time': "Time",
+    # JSON type
+    'json': "JSON",
+    # Enum/Set types
+    'enum': "Select", 'set': "Select",
+    # Binary types
+    'blob': "Text", 'mediumblob': "Text", 'longblob': "Text",
+    'binary': "Text", 'varbinary': "Text",
+}
+
+
+# The commit date is read from git once per process; it can't change under a
+# running worker, so there's no need to fork git per request. Failures raise
+# and so aren't cached. Call _get_git_commit_date.cache_clear() to force a re-read.
+@lru_cache(maxsize=1)
+def _get_git_commit_date():
+    """Get the last commit date ("2025-12-30 15:30") of the app's git repo."""
+    # Get directory of this file to find git repo
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    # Bounded, so a stuck git can't hang the worker
+    return subprocess.run(
+        ['git', 'log', '-1', '--format=%ci'],
+        cwd=app_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        timeout=2,
+        check=True
+    ).stdout.strip()[:16]
 
 
 def get_version_info():
     """Get version info with timestamp from git."""
     try:
-        # Get directory of this file to find git repo
-        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Get last commit date
-        date = subprocess.check_output(
-            ['git', 'log', '-1', '--format=%ci'],
-            cwd=app_dir,
-            stderr=subprocess.DEVNULL
-        ).decode().strip()[:16]  # "2025-12-30 15:30"
+        date = _get_git_commit_date()
         
         return {
             "version": __version__,
             "timestamp": date,
             "display": f"v{__version__} ({date})"
         }
-    except Exception:
+    except (subprocess.SubprocessError, OSError):
         return {
             "version": __version__,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
@@ -45,6 +114,7 @@ def get_app_version():
     return get_version_info()
 
 
+@lru_cache(maxsize=256)
 def mysql_type_to_frappe_fieldtype(mysql_type):
     """
     Convert MySQL column type to Frappe fieldtype.
@@ -61,64 +131,27 @@ def mysql_type_to_frappe_fieldtype(mysql_type):
     # Normalize to lowercase for matching
     mysql_type = mysql_type.lower().strip()
     
-    # Extract base type (remove size/precision info)
-    base_type = re.split(r'[\(\s]', mysql_type)[0]
+    # Extract base type (remove size/precision info and modifiers like "unsigned")
+    head, _, size = mysql_type.partition('(')
+    head = head.split(None, 1)
+    base_type = head[0] if head else ""
     
-    # Integer types
-    if base_type in ('int', 'integer', 'bigint', 'mediumint', 'smallint', 'tinyint'):
-        # Check if it's a boolean (tinyint(1))
-        if base_type == 'tinyint' and '(1)' in mysql_type:
-            return "Check"
-        return "Int"
+    # Boolean (tinyint(1))
+    if base_type == 'tinyint' and '(1)' in mysql_type:
+        return "Check"
     
-    # Decimal/Float types
-    if base_type in ('decimal', 'numeric', 'float', 'double', 'real'):
-        return "Float"
-    
-    # String types
-    if base_type in ('varchar', 'char'):
-        # Check length - if > 140, use Small Text
-        match = re.search(r'\((\d+)\)', mysql_type)
-        if match:
-            length = int(match.group(1))
-            if length > 140:
-                return "Small Text"
+    # String types - if length > 140, use Small Text
+    if base_type in _STRING_TYPES:
+        length = size.partition(')')[0]
+        if length.isdigit() and int(length) > 140:
+            return "Small Text"
         return "Data"
     
-    # Text types
-    if base_type in ('text', 'mediumtext', 'longtext'):
-        return "Text"
-    if base_type == 'tinytext':
-        return "Small Text"
-    
-    # Date/Time types
-    if base_type == 'date':
-        return "Date"
-    if base_type in ('datetime', 'timestamp'):
-        return "Datetime"
-    if base_type == 'time':
-        return "Time"
-    
-    # JSON type
-    if base_type == 'json':
-        return "JSON"
-    
-    # Enum type
-    if base_type == 'enum':
-        return "Select"
-    
-    # Set type
-    if base_type == 'set':
-        return "Select"
-    
-    # Binary types
-    if base_type in ('blob', 'mediumblob', 'longblob', 'binary', 'varbinary'):
-        return "Text"
-    
-    # Default to Data for unknown types
-    return "Data"
+    # Everything else maps on base type alone; default to Data for unknown types
+    return _MYSQL_TO_FRAPPE_FIELDTYPE.get(base_type, "Data")
 
 
+@lru_cache(maxsize=256)
 def get_enum_options(mysql_type):
     """
     Extract options from MySQL ENUM type definition.
@@ -129,22 +162,41 @@ def get_enum_options(mysql_type):
     Returns:
         str: Newline-separated options for Frappe Select field, or empty string
     """
-    if not mysql_type or not mysql_type.lower().startswith('enum'):
+    if not mysql_type or mysql_type[:4].lower() != 'enum':
         return ""
     
-    # Extract values between parentheses
-    match = re.search(r"enum\s*\((.+)\)", mysql_type, re.IGNORECASE)
-    if not match:
+    # Extract values between the outer parentheses
+    lp = mysql_type.find('(')
+    rp = mysql_type.rfind(')')
+    if lp == -1 or rp <= lp + 1 or mysql_type[4:lp].strip():
         return ""
     
     # Parse the comma-separated quoted values
-    values_str = match.group(1)
+    values_str = mysql_type[lp + 1:rp]
     # Match quoted strings (handles both single and double quotes)
-    values = re.findall(r"['\"]([^'\"]+)['\"]", values_str)
+    values = _QUOTED_VALUE_RE.findall(values_str)
     
     return "\n".join(values)
 
 
+@lru_cache(maxsize=512)
+def column_label(col_name):
+    """Readable label for a WordPress column (e.g. 'user_login' -> 'User Login')."""
+    return col_name.replace('_', ' ').title()
+
+
+# Tracking field holding a hash of the synced values (see tasks._flush_sync_batch);
+# added to new mirror DocTypes and, by sync_doctype_schema, to existing ones
+ROW_HASH_FIELD = {
+    "fieldname": "track_row_hash",
+    "fieldtype": "Data",
+    "label": "Row Hash",
+    "length": 16,
+    "read_only": 1,
+    "hidden": 1
+}
+
+
 def generate_doctype_from_wp_table(table_name, columns, doctype_name=None, task_name=None, field_types_override=None):
     """
     Generate a Frappe DocType definition from WordPress table columns.
@@ -175,89 +227,79 @@ def generate_doctype_from_wp_table(table_name, columns, doctype_name=None, task_
         # Fallback to table-based naming
         autoname_pattern = f"WP-{table_name[:10].upper()}-.#####"
     
-    # Find primary key column
-    primary_key_col = None
-    for col in columns:
-        if col.get('IS_PRIMARY_KEY') == 'YES':
-            primary_key_col = col.get('COLUMN_NAME')
-            break
-    
-    # Build fields list
-    fields = []
-    field_order = []
-    
-    # Add a section break for main data
-    fields.append({
-        "fieldname": "wp_data_section",
-        "fieldtype": "Section Break",
-        "label": "WordPress Data"
-    })
-    field_order.append("wp_data_section")
-    
-    # Add source table reference field (hidden, for tracking)
-    fields.append({
-        "fieldname": "track_source_table",
-        "fieldtype": "Data",
-        "label": "Source Table",
-        "default": table_name,
-        "read_only": 1,
-        "hidden": 1
-    })
-    field_order.append("track_source_table")
-    
-    # Add source record ID field (for linking back to WP)
-    fields.append({
-        "fieldname": "track_record_id",
-        "fieldtype": "Data",
-        "label": "Record ID",
-        "read_only": 1,
-        "in_list_view": 1,
-        "in_standard_filter": 1
-    })
-    field_order.append("track_record_id")
-    
-    # Add column break
-    fields.append({
-        "fieldname": "column_break_1",
-        "fieldtype": "Column Break"
-    })
-    field_order.append("column_break_1")
-    
-    # Add last synced timestamp
-    fields.append({
-        "fieldname": "track_last_synced",
-        "fieldtype": "Datetime",
-        "label": "Last Synced",
-        "read_only": 1
-    })
-    field_order.append("track_last_synced")
-    
-    # Add section break for WordPress columns
-    fields.append({
-        "fieldname": "wp_columns_section",
-        "fieldtype": "Section Break",
-        "label": "Data Fields"
-    })
-    field_order.append("wp_columns_section")
+    # Build fields list, starting with the fixed tracking/layout fields
+    fields = [
+        # Section break for main data
+        {
+            "fieldname": "wp_data_section",
+            "fieldtype": "Section Break",
+            "label": "WordPress Data"
+        },
+        # Source table reference field (hidden, for tracking)
+        {
+            "fieldname": "track_source_table",
+            "fieldtype": "Data",
+            "label": "Source Table",
+            "default": table_name,
+            "read_only": 1,
+            "hidden": 1
+        },
+        # Source record ID field (for linking back to WP)
+        {
+            "fieldname": "track_record_id",
+            "fieldtype": "Data",
+            "label": "Record ID",
+            "read_only": 1,
+            "in_list_view": 1,
+            "in_standard_filter": 1
+        },
+        {
+            "fieldname": "column_break_1",
+            "fieldtype": "Column Break"
+        },
+        # Last synced timestamp
+        {
+            "fieldname": "track_last_synced",
+            "fieldtype": "Datetime",
+            "label": "Last Synced",
+            "read_only": 1
+        },
+        # Content hash of the synced values (unchanged rows are skipped)
+        dict(ROW_HASH_FIELD),
+        # Section break for WordPress columns
+        {
+            "fieldname": "wp_columns_section",
+            "fieldtype": "Section Break",
+            "label": "Data Fields"
+        },
+    ]
     
     # Track fieldnames to prevent duplicates (case-insensitive)
     seen_fieldnames = set()
     
+    # Bind hot-loop callables to locals (avoids global/attribute lookups per column)
+    to_fieldtype = mysql_type_to_frappe_fieldtype
+    enum_options = get_enum_options
+    add_field = fields.append
+    
     # Convert each WordPress column to a Frappe field
     col_count = 0
+    total_columns = len(columns)
     for col in columns:
-        col_name = col.get('COLUMN_NAME', '')
-        col_type = col.get('COLUMN_TYPE', '')
-        is_nullable = col.get('IS_NULLABLE', 'YES')
-        col_default = col.get('COLUMN_DEFAULT')
-        is_pk = col.get('IS_PRIMARY_KEY') == 'YES'
-        is_unique = col.get('IS_UNIQUE') == 'YES'
-        is_indexed = col.get('IS_INDEXED') == 'YES'
+        get = col.get
+        col_name = get('COLUMN_NAME', '')
         
         # Skip if no column name
         if not col_name:
             continue
         
+        col_type = get('COLUMN_TYPE', '')
+        is_nullable = get('IS_NULLABLE', 'YES')
+        col_default = get('COLUMN_DEFAULT')
+        is_pk = get('IS_PRIMARY_KEY') == 'YES'
+        is_unique = get('IS_UNIQUE') == 'YES'
+        is_indexed = get('IS_INDEXED') == 'YES'
+        
         # Fieldname = EXACT WordPress column name (no changes)
         fieldname = col_name
         
@@ -271,34 +313,32 @@ def generate_doctype_from_wp_table(table_name, columns, doctype_name=None, task_
         if field_types_override and col_name in field_types_override:
             fieldtype = field_types_override[col_name]
         else:
-            fieldtype = mysql_type_to_frappe_fieldtype(col_type)
+            fieldtype = to_fieldtype(col_type)
         
         # Build field definition
         field_def = {
             "fieldname": fieldname,
             "fieldtype": fieldtype,
-            "label": col_name.replace('_', ' ').title(),  # Nice readable label
+            "label": column_label(col_name),
             "reqd": 1 if is_nullable == 'NO' and not is_pk else 0
         }
         
         # Add options for Select fields (ENUM)
         if fieldtype == "Select":
-            options = get_enum_options(col_type)
+            options = enum_options(col_type)
             if options:
                 field_def["options"] = options
         
         # Set default if present (skip auto-enter/function-based defaults)
-        auto_defaults = ['CURRENT_TIMESTAMP', 'NOW()', 'CURRENT_DATE', 'CURRENT_TIME', 'UUID()']
-        col_extra = col.get('EXTRA', '').upper()
-        is_auto_field = (
-            'AUTO_INCREMENT' in col_extra or
-            'GENERATED' in col_extra or
-            'DEFAULT_GENERATED' in col_extra
-        )
-        
-        if col_default is not None and col_default != 'NULL' and not is_auto_field:
-            if col_default.upper() not in auto_defaults and not col_default.upper().startswith('CURRENT_'):
-                field_def["default"] = col_default
+        if col_default is not None and col_default != 'NULL':
+            # 'GENERATED' also matches DEFAULT_GENERATED
+            col_extra = (get('EXTRA') or '').upper()
+            is_auto_field = 'AUTO_INCREMENT' in col_extra or 'GENERATED' in col_extra
+            
+            if not is_auto_field:
+                default_upper = col_default.upper()
+                if default_upper not in _AUTO_DEFAULTS and not default_upper.startswith('CURRENT_'):
+                    field_def["default"] = col_default
         
         # Primary key field settings
         if is_pk:
@@ -315,18 +355,16 @@ def generate_doctype_from_wp_table(table_name, columns, doctype_name=None, task_
         if col_count < 3:
             field_def["in_list_view"] = 1
         
-        fields.append(field_def)
-        field_order.append(fieldname)
+        add_field(field_def)
         
         # Add column break every 2 fields for better layout
         col_count += 1
-        if col_count % 2 == 0 and col_count < len(columns):
+        if col_count % 2 == 0 and col_count < total_columns:
             cb_name = f"column_break_{col_count}"
-            fields.append({
+            add_field({
                 "fieldname": cb_name,
                 "fieldtype": "Column Break"
             })
-            field_order.append(cb_name)
     
     # Build complete DocType definition
     doctype_def = {
@@ -344,7 +382,7 @@ def generate_doctype_from_wp_table(table_name, columns, doctype_name=None, task_
         "quick_entry": 0,
         "track_changes": 1,
         "fields": fields,
-        "field_order": field_order,
+        "field_order": [f["fieldname"] for f in fields],
         "permissions": [
             {
                 "role": "System Manager",
@@ -454,21 +492,14 @@ def preview_mirror_doctype(table_name):
             "column": col_name,
             "mysql_type": col_type,
             "suggested_type": suggested_type,
-            "label": col_name.replace('_', ' ').title()
+            "label": column_label(col_name)
         })
     
-    # Available Frappe field types for dropdown
-    field_types = [
-        "Data", "Int", "Float", "Check", "Date", "Datetime", 
-        "Time", "Text", "Small Text", "Select", "JSON", "Link",
-        "Currency", "Percent", "Rating", "Color", "Password"
-    ]
-    
     return {
         "success": True,
         "table_name": table_name,
         "preview": preview,
-        "field_types": field_types
+        "field_types": MIRROR_FIELD_TYPES
     }
 
 
@@ -511,13 +542,7 @@ def create_mirror_doctype(table_name, doctype_name=None, task_name=None, field_t
         }
     
     # Parse field_types if provided as JSON string
-    import json
-    field_types_override = None
-    if field_types:
-        if isinstance(field_types, str):
-            field_types_override = json.loads(field_types)
-        else:
-            field_types_override = field_types
+    field_types_override = frappe.parse_json(field_types) if field_types else None
     
     # Step 2: Generate DocType definition
     doctype_def = generate_doctype_from_wp_table(table_name, columns, doctype_name, task_name, field_types_override)
@@ -535,13 +560,11 @@ def create_mirror_doctype(table_name, doctype_name=None, task_name=None, field_t
     
     # Step 3: Drop existing DocType and table if they exist
     if frappe.db.exists("DocType", final_doctype_name):
-        # Delete the DocType
+        # Delete the DocType (this also drops its table)
         frappe.delete_doc("DocType", final_doctype_name, force=True, ignore_permissions=True)
-        frappe.db.commit()
-    
-    # Drop the underlying table if it exists (in case DocType was deleted but table remains)
-    table_name_sql = f"tab{final_doctype_name}"
-    frappe.db.sql_ddl(f"DROP TABLE IF EXISTS `{table_name_sql}`")
+    else:
+        # Drop an orphaned table (in case DocType was deleted but table remains)
+        frappe.db.sql_ddl(f"DROP TABLE IF EXISTS `tab{final_doctype_name}`")
     frappe.db.commit()
     
     # Step 4: Create the DocType
@@ -550,22 +573,23 @@ def create_mirror_doctype(table_name, doctype_name=None, task_name=None, field_t
         doc.insert(ignore_permissions=True)
         frappe.db.commit()
         
-        # Build comparison table: source | fieldname | label
-        comparison = []
-        for col in columns:
-            source_col = col.get("COLUMN_NAME", "")
-            comparison.append({
+        # Build column list and comparison table (source | fieldname | label) in one pass
+        column_names = [col.get("COLUMN_NAME", "") for col in columns]
+        comparison = [
+            {
                 "source": source_col,
                 "fieldname": source_col,  # EXACT match
-                "label": source_col.replace('_', ' ').title()
-            })
+                "label": column_label(source_col)
+            }
+            for source_col in column_names
+        ]
         
         return {
             "success": True,
             "message": f"DocType '{final_doctype_name}' created successfully",
             "doctype_name": final_doctype_name,
             "field_count": len(columns),
-            "columns": [c.get("COLUMN_NAME") for c in columns],
+            "columns": column_names,
             "comparison": comparison,
             "schema": columns
         }
@@ -592,8 +616,10 @@ def sync_doctype_schema(table_name, doctype_name):
     """
     frappe.only_for("System Manager")
     
-    # Check DocType exists
-    if not frappe.db.exists("DocType", doctype_name):
+    # Check DocType exists (via the cached meta - this runs on every scheduled sync)
+    try:
+        meta = frappe.get_meta(doctype_name)
+    except frappe.DoesNotExistError:
         return {
             "success": False,
             "message": f"DocType '{doctype_name}' does not exist"
@@ -609,12 +635,16 @@ def sync_doctype_schema(table_name, doctype_name):
     
     wp_columns = wp_result.get("columns", [])
     
-    # Get existing DocType fields (case-insensitive for comparison)
-    doctype_doc = frappe.get_doc("DocType", doctype_name)
-    existing_fieldnames_lower = {f.fieldname.lower() for f in doctype_doc.fields}
+    # Get existing DocType fields from the cached meta (case-insensitive for comparison)
+    existing_fieldnames_lower = {f.fieldname.lower() for f in meta.fields}
+    
+    # Bind hot-loop callables to locals (avoids global/attribute lookups per column)
+    to_fieldtype = mysql_type_to_frappe_fieldtype
+    enum_options = get_enum_options
     
     # Find new columns (not in DocType)
     new_fields = []
+    add_new_field = new_fields.append
     for col in wp_columns:
         col_name = col.get("COLUMN_NAME", "")
         if not col_name:
@@ -633,14 +663,13 @@ def sync_doctype_schema(table_name, doctype_name):
             is_indexed = col.get("IS_INDEXED") == "YES"
             is_pk = col.get("IS_PRIMARY_KEY") == "YES"
             
-            fieldtype = mysql_type_to_frappe_fieldtype(col_type)
+            fieldtype = to_fieldtype(col_type)
             
             field_def = {
                 "fieldname": fieldname,
                 "fieldtype": fieldtype,
-                "label": col_name.replace('_', ' ').title(),  # Nice readable label
-                "reqd": 0,  # Don't make required - existing records won't have it
-                "insert_after": doctype_doc.fields[-1].fieldname if doctype_doc.fields else None
+                "label": column_label(col_name),
+                "reqd": 0  # Don't make required - existing records won't have it
             }
             
             # Add index settings
@@ -651,11 +680,16 @@ def sync_doctype_schema(table_name, doctype_name):
             
             # Add options for Select fields
             if fieldtype == "Select":
-                options = get_enum_options(col_type)
+                options = enum_options(col_type)
                 if options:
                     field_def["options"] = options
             
-            new_fields.append(field_def)
+            add_new_field(field_def)
+    
+    # Mirror DocTypes created before track_row_hash existed get it here, so
+    # unchanged-row skipping applies to them too
+    if "track_record_id" in existing_fieldnames_lower and "track_row_hash" not in existing_fieldnames_lower:
+        add_new_field(dict(ROW_HASH_FIELD))
     
     if not new_fields:
         return {
@@ -664,16 +698,19 @@ def sync_doctype_schema(table_name, doctype_name):
             "fields_added": 0
         }
     
-    # Add new fields to DocType
+    # Add new fields to DocType - only now load the full DocType document
     try:
-        for field_def in new_fields:
-            doctype_doc.append("fields", field_def)
+        doctype_doc = frappe.get_doc("DocType", doctype_name)
+        # Capture the original last field once so every new field anchors to it
+        insert_after = doctype_doc.fields[-1].fieldname if doctype_doc.fields else None
+        doctype_doc.extend("fields", [dict(f, insert_after=insert_after) for f in new_fields])
         
         doctype_doc.save(ignore_permissions=True)
         frappe.db.commit()
         
         # Clear cache so new fields take effect
         frappe.clear_cache(doctype=doctype_name)
+        clear_wp_table_columns_cache(table_name)
         
         return {
             "success": True,
@@ -697,8 +734,6 @@ def run_all_tasks():
     Returns:
         dict: Results from all tasks
     """
-    from nce.wp_sync.tasks import run_scheduled_sync
-
     frappe.only_for("System Manager")
 
     results = run_scheduled_sync()
@@ -720,8 +755,6 @@ def run_task(task_name):
     Returns:
         dict: Result from the task
     """
-    from nce.wp_sync.tasks import run_single_task
-
     frappe.only_for("System Manager")
 
     if not frappe.db.exists("WP Sync Task", task_name):
@@ -736,26 +769,31 @@ def run_multiple_tasks(task_names):
     """
     Manually trigger multiple sync tasks.
 
+    Tasks with different target DocTypes run concurrently (see
+    tasks.MAX_PARALLEL_TASKS); results are returned in the order the tasks
+    were given.
+
     Args:
         task_names: List of WP Sync Task names (JSON array)
 
     Returns:
         dict: Results from all tasks
     """
-    from nce.wp_sync.tasks import run_single_task
-    import json
-
     frappe.only_for("System Manager")
     
-    # Parse task names if passed as JSON string
-    if isinstance(task_names, str):
-        task_names = json.loads(task_names)
+    # Parse task names if passed as JSON string (lists pass through as-is)
+    task_names = frappe.parse_json(task_names)
     
-    results = []
-    for task_name in task_names:
-        if frappe.db.exists("WP Sync Task", task_name):
-            result = run_single_task(task_name)
-            results.append(result)
+    # Drop duplicates (keeping order) and check existence in a single query
+    task_names = list(dict.fromkeys(task_names))
+    existing = set(frappe.get_all(
+        "WP Sync Task",
+        filters={"name": ["in", task_names]},
+        pluck="name"
+    )) if task_names else set()
+    
+    # Run concurrently; tasks sharing a target DocType run one after another
+    results = run_tasks_parallel([name for name in task_names if name in existing])
     
     return {
         "success": True,
@@ -767,83 +805,201 @@ def run_multiple_tasks(task_names):
 @frappe.whitelist()
 def test_wp_connection():
     """
-    Test the WordPress database connection.
+    Test the WordPress REST API connection.
 
     Returns:
         dict: Connection status
     """
     frappe.only_for("System Manager")
 
-    from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import get_wp_connection
-
     try:
-        connection = get_wp_connection()
-        cursor = connection.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        connection.close()
+        execute_wp_query("SELECT 1")
         return {"success": True, "message": "Connection successful!"}
     except Exception as e:
         return {"success": False, "message": str(e)}
 
 
 @frappe.whitelist()
-def get_wp_table_columns(table_name):
+def get_wp_table_columns(table_name, refresh=False):
     """
     Get column information from a WordPress table via REST API.
     
-    Uses simple SHOW COLUMNS query which returns:
-    - Field, Type, Null, Key (PRI/UNI/MUL), Default, Extra
+    Thin wrapper around get_wp_table_columns_bulk() for a single table.
+    Successful results are cached for a few minutes.
 
     Args:
         table_name: Name of the WordPress table/view
+        refresh: Bypass the cache and re-read the structure from WordPress
 
     Returns:
         dict: Success status and column information
     """
     frappe.only_for("System Manager")
 
-    from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import execute_wp_query
-
-    # Validate table name (basic security check)
-    if not table_name or not isinstance(table_name, str):
+    # Validate table name against a strict allowlist
+    if not isinstance(table_name, str) or not _TABLE_NAME_RE.fullmatch(table_name.strip()):
         return {"success": False, "message": "Invalid table name"}
     
-    # Remove any potential SQL injection attempts (basic sanitization)
-    table_name = table_name.strip().replace('`', '').replace(';', '').replace('--', '')
+    table_name = table_name.strip()
+    cache_key = _WP_COLUMNS_CACHE_KEY.format(table_name)
     
-    # Simple query to get column info
-    query = f"SHOW COLUMNS FROM {table_name}"
+    if not cint(refresh):
+        cached = frappe.cache().get_value(cache_key)
+        if cached:
+            return cached
 
     try:
-        raw_columns = execute_wp_query(query)
+        columns = get_wp_table_columns_bulk([table_name]).get(table_name)
         
-        # Normalize output to consistent format for generate_doctype_from_wp_table
-        columns = []
-        for col in raw_columns:
-            columns.append({
-                "COLUMN_NAME": col.get("Field"),
-                "COLUMN_TYPE": col.get("Type"),
-                "IS_NULLABLE": col.get("Null", "YES"),
-                "COLUMN_DEFAULT": col.get("Default"),
-                "EXTRA": col.get("Extra", ""),
-                "KEY": col.get("Key", ""),  # PRI, UNI, MUL, or empty
-                "IS_PRIMARY_KEY": "YES" if col.get("Key") == "PRI" else "NO",
-                "IS_UNIQUE": "YES" if col.get("Key") == "UNI" else "NO",
-                "IS_INDEXED": "YES" if col.get("Key") in ("PRI", "UNI", "MUL") else "NO"
-            })
+        if columns is None:
+            return {"success": False, "message": f"Table '{table_name}' not found"}
         
-        return {
-            "success": True,
-            "table_name": table_name,
-            "columns": columns,
-            "column_count": len(columns)
-        }
+        return _cache_wp_table_columns(table_name, columns)
     except Exception as e:
         frappe.log_error(f"Error getting table columns for {table_name}: {str(e)}", "WP Sync Error")
         return {"success": False, "message": str(e)}
 
 
+def get_wp_table_columns_bulk(table_names):
+    """
+    Get column information for several WordPress tables in one round trip.
+    
+    Queries information_schema.COLUMNS once for all tables instead of
+    issuing a SHOW COLUMNS per table. Column order follows the table
+    definition (ORDINAL_POSITION).
+
+    Args:
+        table_names: List of WordPress table/view names; "schema.table"
+                     names are looked up in that schema, others in the
+                     WordPress database
+
+    Returns:
+        dict: {table_name: [column dicts]} for each table that exists;
+              missing tables are absent from the result
+    """
+    if not table_names:
+        return {}
+    
+    # The REST endpoint takes raw SQL, so names are allowlisted before quoting
+    for name in table_names:
+        if not _TABLE_NAME_RE.fullmatch(name or ""):
+            frappe.throw(_("Invalid table name: {0}").format(name))
+    
+    # information_schema may report a different case than requested, so
+    # requests are keyed lowercased: (schema or "", table)
+    requested = {}
+    for name in table_names:
+        schema, _dot, table = name.rpartition(".")
+        requested[(schema.lower(), table.lower())] = name
+    
+    conditions = []
+    unqualified = [table for schema, table in requested if not schema]
+    if unqualified:
+        names_sql = ", ".join(f"'{table}'" for table in unqualified)
+        conditions.append(f"(TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({names_sql}))")
+    conditions.extend(
+        f"(TABLE_SCHEMA = '{schema}' AND TABLE_NAME = '{table}')"
+        for schema, table in requested if schema
+    )
+    
+    query = f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE,
+               COLUMN_DEFAULT, EXTRA, COLUMN_KEY,
+               TABLE_SCHEMA = DATABASE() AS IS_CURRENT_SCHEMA
+        FROM information_schema.COLUMNS
+        WHERE {" OR ".join(conditions)}
+        ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+    """
+    
+    result = defaultdict(list)
+    
+    for col in execute_wp_query(query) or []:
+        table_key = (col.get("TABLE_NAME") or "").lower()
+        # A table in the WordPress database may be requested both with and
+        # without its schema
+        tables = [requested.get(((col.get("TABLE_SCHEMA") or "").lower(), table_key))]
+        if cint(col.get("IS_CURRENT_SCHEMA")):
+            tables.append(requested.get(("", table_key)))
+        tables = [table for table in tables if table]
+        if not tables:
+            continue
+        
+        # Normalize output to consistent format for generate_doctype_from_wp_table.
+        # COLUMN_KEY is only ever PRI, UNI, MUL or empty, so any key means indexed.
+        key = col.get("COLUMN_KEY") or ""
+        column = {
+            "COLUMN_NAME": col.get("COLUMN_NAME"),
+            "COLUMN_TYPE": col.get("COLUMN_TYPE"),
+            "IS_NULLABLE": col.get("IS_NULLABLE") or "YES",
+            "COLUMN_DEFAULT": _unquote_column_default(col.get("COLUMN_DEFAULT")),
+            "EXTRA": col.get("EXTRA") or "",
+            "KEY": key,
+            "IS_PRIMARY_KEY": "YES" if key == "PRI" else "NO",
+            "IS_UNIQUE": "YES" if key == "UNI" else "NO",
+            "IS_INDEXED": "YES" if key else "NO"
+        }
+        for table in tables:
+            result[table].append(column)
+    
+    return dict(result)
+
+
+def prefetch_wp_table_columns(table_names):
+    """
+    Warm the column cache for several WordPress tables with one query.
+    
+    Tables that are already cached (or have invalid names) are skipped, so
+    later get_wp_table_columns() calls for these tables are cache hits.
+
+    Args:
+        table_names: Iterable of WordPress table/view names
+    """
+    cache = frappe.cache()
+    missing = [
+        name for name in set(table_names)
+        if name and _TABLE_NAME_RE.fullmatch(name)
+        and not cache.get_value(_WP_COLUMNS_CACHE_KEY.format(name))
+    ]
+    
+    for table_name, columns in get_wp_table_columns_bulk(missing).items():
+        _cache_wp_table_columns(table_name, columns)
+
+
+def _cache_wp_table_columns(table_name, columns):
+    """Build the get_wp_table_columns() result for a table and cache it."""
+    result = {
+        "success": True,
+        "table_name": table_name,
+        "columns": columns,
+        "column_count": len(columns)
+    }
+    frappe.cache().set_value(
+        _WP_COLUMNS_CACHE_KEY.format(table_name), result, expires_in_sec=_WP_COLUMNS_CACHE_TTL
+    )
+    return result
+
+
+def clear_wp_table_columns_cache(table_name):
+    """Forget cached column info for a WordPress table."""
+    frappe.cache().delete_value(_WP_COLUMNS_CACHE_KEY.format(table_name))
+
+
+def _unquote_column_default(value):
+    """
+    Strip the quotes MariaDB puts around literal defaults in information_schema.
+    
+    SHOW COLUMNS reports 'abc' as abc; information_schema on MariaDB reports
+    it as 'abc' (expressions such as current_timestamp() stay unquoted).
+    """
+    if isinstance(value, str) and len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+# MySQL/MariaDB error raised when TRUNCATE hits a table referenced by a foreign key
+ER_TRUNCATE_ILLEGAL_FK = 1701
+
+
 @frappe.whitelist()
 def delete_all_records(doctype):
     """
@@ -866,9 +1022,14 @@ def delete_all_records(doctype):
     # Get count before deletion
     count = frappe.db.count(doctype)
     
-    # Delete all records using direct SQL (faster than doc.delete() for bulk)
-    frappe.db.sql("DELETE FROM `tab{0}`".format(doctype))
-    frappe.db.commit()
+    # Empty the table with TRUNCATE (resets the table instead of deleting row
+    # by row); fall back to DELETE only when a foreign key refuses it
+    try:
+        frappe.db.sql_ddl("TRUNCATE TABLE `tab{0}`".format(doctype))
+    except frappe.db.OperationalError as e:
+        if not e.args or e.args[0] != ER_TRUNCATE_ILLEGAL_FK:
+            raise
+        frappe.db.sql("DELETE FROM `tab{0}`".format(doctype))
     
     # Reset the naming series counter
     frappe.db.sql("DELETE FROM `tabSeries` WHERE name LIKE %s", (f"{doctype}%",))
@@ -935,8 +1096,6 @@ def get_sync_status():
     """
     frappe.only_for("System Manager")
 
-    from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import get_wp_settings
-
     settings = get_wp_settings()
 
     # Get recent logs
@@ -947,9 +1106,13 @@ def get_sync_status():
         limit=10
     )
 
-    # Get task counts
-    total_tasks = frappe.db.count("WP Sync Task")
-    enabled_tasks = frappe.db.count("WP Sync Task", {"enabled": 1})
+    # Get task counts (total and enabled in one query)
+    counts = frappe.db.sql("""
+        SELECT COUNT(*) AS total, COALESCE(SUM(enabled), 0) AS enabled
+        FROM `tabWP Sync Task`
+    """, as_dict=True)[0]
+    total_tasks = int(counts.total)
+    enabled_tasks = int(counts.enabled)
 
     return {
         "sync_enabled": settings.sync_enabled,
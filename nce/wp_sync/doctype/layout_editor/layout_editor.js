@@ -252,7 +252,8 @@ function load_doctype_json(frm) {
         },
         callback: function(r) {
             if (r.message) {
-                frm.set_value("json_editor", r.message.fields_json);
+                // Pretty-print client-side; the server only sends structured fields
+                frm.set_value("json_editor", JSON.stringify(r.message.fields, null, 2));
                 frm.set_df_property('structure_preview', 'options', r.message.structure_html);
                 
                 // Reset validation state
@@ -281,14 +282,55 @@ function update_properties(frm) {
         `This will create/update Property Setters in the database.`,
         function() {
             // User confirmed
+            // Listen before calling: a fast background job can finish
+            // before the call's callback runs
+            const doctype_name = frm.doc.target_doctype;
+            const on_apply_done = function(data) {
+                if (data.doctype_name !== doctype_name) return;
+                frappe.realtime.off('layout_apply_done', on_apply_done);
+                if (data.success) {
+                    frappe.msgprint({
+                        title: '✅ Success',
+                        indicator: 'green',
+                        message: data.message + '<br><br>Reload the JSON to see the applied changes.'
+                    });
+                } else {
+                    frappe.msgprint({
+                        title: 'Error',
+                        indicator: 'red',
+                        message: 'Applying customizations failed: ' + (data.error || 'Unknown error')
+                    });
+                }
+            };
+            frappe.realtime.on('layout_apply_done', on_apply_done);
+            
             frappe.call({
-                method: "nce.wp_sync.doctype.layout_editor.layout_editor.update_properties",
+                method: "nce.wp_sync.doctype.layout_editor.layout_editor.apply_customizations",
                 args: {
                     doctype_name: frm.doc.target_doctype,
                     json_str: frm.doc.json_editor
                 },
+                error: function() {
+                    frappe.realtime.off('layout_apply_done', on_apply_done);
+                },
                 callback: function(r) {
-                    if (r.message && r.message.success) {
+                    if (!(r.message && r.message.async)) {
+                        // Applied (or rejected) synchronously - no job to wait for
+                        frappe.realtime.off('layout_apply_done', on_apply_done);
+                    }
+                    
+                    if (r.message && r.message.async) {
+                        // Large change set - applied by a background job
+                        frappe.show_alert({
+                            message: r.message.message,
+                            indicator: 'blue'
+                        });
+                        
+                        // Reset state
+                        frm.doc.__validated = false;
+                        frm.doc.__json_changed = false;
+                        frm.refresh();
+                    } else if (r.message && r.message.success) {
                         frappe.show_alert({
                             message: r.message.message,
                             indicator: 'green'
@@ -304,11 +346,21 @@ function update_properties(frm) {
                         frm.doc.__validated = false;
                         frm.doc.__json_changed = false;
                         frm.refresh();
+                    } else if (r.message && r.message.errors) {
+                        // Validation failed on apply - nothing was changed
+                        frm.doc.__validated = false;
+                        frm.refresh();
+                        
+                        frappe.msgprint({
+                            title: 'Validation Failed',
+                            indicator: 'red',
+                            message: '<ol><li>' + r.message.errors.join('</li><li>') + '</li></ol>'
+                        });
                     } else {
                         frappe.msgprint({
                             title: 'Error',
                             indicator: 'red',
-                            message: 'Failed to apply customizations'
+                            message: (r.message && r.message.message) || 'Failed to apply customizations'
                         });
                     }
                 }
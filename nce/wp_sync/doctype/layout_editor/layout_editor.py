@@ -3,7 +3,51 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.core.doctype.doctype.doctype import validate_fields_for_doctype
+from frappe.utils import now_datetime
 import json
+from collections import Counter
+
+from nce.wp_sync.utils import json_dumps, json_loads
+
+# Fieldtypes accepted by validate_json_for_customizations
+VALID_FIELDTYPES = frozenset({
+    "Data", "Text", "Small Text", "Text Editor", "Code", "Select", "Link",
+    "Dynamic Link", "Check", "Int", "Float", "Currency", "Date", "Time",
+    "Datetime", "Duration", "Password", "Percent", "Long Text", "HTML",
+    "Markdown Editor", "Attach", "Attach Image", "Signature", "Color",
+    "Barcode", "Geolocation", "HTML Editor", "Read Only", "Button",
+    "Table", "Table MultiSelect", "Section Break", "Column Break", "Tab Break",
+    "Heading", "Image", "Fold", "Rating", "Icon", "Autocomplete", "JSON"
+})
+
+# DocField keys that are document metadata rather than layout properties
+_META_STRIP_KEYS = frozenset({
+    'name', 'owner', 'creation', 'modified', 'modified_by',
+    'docstatus', 'parent', 'parentfield', 'parenttype',
+    'idx', 'doctype', '__islocal', '__onload', '__unsaved'
+})
+
+# Values dropped from exported field dicts
+_EMPTY_VALUES = (None, "", 0, [])
+
+# Cached load_doctype_json results, validated against the DocType's modified timestamp
+LAYOUT_JSON_CACHE_KEY = "nce:layout_json:{0}"
+LAYOUT_JSON_CACHE_TTL = 3600
+
+# Property Setter changes above this count are written by a background job
+ASYNC_APPLY_THRESHOLD = 200
+
+# Structure preview HTML templates
+_PREVIEW_OPEN = '<div style="font-family: monospace; font-size: 12px; line-height: 1.6;">'
+_HIDDEN_BADGE = ' <span style="color: red; font-size: 10px;">[HIDDEN]</span>'
+_TAB_TMPL = '<div style="margin-top: 10px; font-weight: bold; color: #2196F3;">📑 TAB: {}{}</div>'
+_SECTION_TMPL = '<div style="margin-top: 8px; margin-left: {}px; font-weight: bold; color: #4CAF50;">📁 SECTION: {}{}{}</div>'
+_COLUMN_TMPL = '<div style="margin-left: {}px; color: #FF9800;">│ ── COLUMN BREAK ──</div>'
+_FIELD_TMPL = '<div style="margin-left: {}px; {}">• {} <span style="color: #999;">({})</span>{}</div>'
+
+# Section/column/field margins (px) before and inside a tab
+_MARGINS = {0: ("0", "20", "40"), 1: ("20", "40", "60")}
 
 
 class LayoutEditor(Document):
@@ -49,54 +93,67 @@ def load_doctype_json(doctype_name):
     
     meta = frappe.get_meta(doctype_name)
     
+    # Serve the cached result while the DocType is unchanged
+    cache_key = LAYOUT_JSON_CACHE_KEY.format(doctype_name)
+    cached = frappe.cache().get_value(cache_key)
+    if cached and cached.get("modified") == str(meta.modified):
+        return cached["result"]
+    
     # Build a complete fields structure with ALL properties
     fields = []
     for field in meta.fields:
-        # Get all field properties as dict
-        field_dict = field.as_dict()
-        
-        # Remove metadata fields that aren't needed for layout
-        remove_keys = [
-            'name', 'owner', 'creation', 'modified', 'modified_by', 
-            'docstatus', 'parent', 'parentfield', 'parenttype', 
-            'idx', 'doctype', '__islocal', '__onload', '__unsaved'
-        ]
-        for key in remove_keys:
-            field_dict.pop(key, None)
-        
         # Ensure essential fields are present
-        if not field_dict.get("fieldname"):
-            continue
-        if not field_dict.get("fieldtype"):
+        if not field.fieldname or not field.fieldtype:
             continue
-            
-        # Clean up - remove None/empty values for cleaner JSON
-        field_dict = {k: v for k, v in field_dict.items() if v not in [None, "", 0, []]}
+        
+        # Single pass: drop metadata keys and None/empty values for cleaner JSON
+        field_dict = {
+            k: v for k, v in field.as_dict().items()
+            if k not in _META_STRIP_KEYS and v not in _EMPTY_VALUES
+        }
         
         # But ensure label exists (can be empty string)
-        if "label" not in field_dict:
-            field_dict["label"] = ""
-            
+        field_dict.setdefault("label", "")
+        
         fields.append(field_dict)
     
     # Build structure preview
     structure = build_structure_preview(fields)
     
-    return {
+    result = {
         "fields": fields,
-        "fields_json": json.dumps(fields, indent=4),
         "structure_html": structure,
         "doctype_name": doctype_name,
         "total_fields": len(fields),
         "source": "Customized version (base JSON + Property Setters merged)"
     }
+    
+    frappe.cache().set_value(
+        cache_key,
+        {"modified": str(meta.modified), "result": result},
+        expires_in_sec=LAYOUT_JSON_CACHE_TTL
+    )
+    
+    return result
+
+
+def clear_layout_json_cache(doc, method=None):
+    """doc_events handler: drop the cached layout JSON when a DocType or its customizations change"""
+    if doc.doctype == "DocType":
+        doctype_name = doc.name
+    else:
+        # Property Setter uses doc_type, Custom Field uses dt
+        doctype_name = doc.get("doc_type") or doc.get("dt")
+    
+    if doctype_name:
+        frappe.cache().delete_value(LAYOUT_JSON_CACHE_KEY.format(doctype_name))
 
 
 @frappe.whitelist()
 def validate_json(json_str):
     """Validate that the JSON is valid and has required structure"""
     try:
-        fields = json.loads(json_str)
+        fields = json_loads(json_str)
         
         if not isinstance(fields, list):
             return {"valid": False, "error": "JSON must be an array of field objects"}
@@ -131,7 +188,7 @@ def validate_json(json_str):
 def generate_cursor_prompt(doctype_name, json_str):
     """Generate a prompt to paste into Cursor"""
     try:
-        fields = json.loads(json_str)
+        fields = json_loads(json_str)
     except json.JSONDecodeError as e:
         frappe.throw(f"Invalid JSON: {str(e)}")
     
@@ -144,12 +201,12 @@ Please update the JSON file for DocType `{doctype_name}` with the following layo
 
 ### New field_order:
 ```json
-{json.dumps(field_order, indent=4)}
+{json_dumps(field_order, indent=True)}
 ```
 
 ### New fields array:
 ```json
-{json.dumps(fields, indent=4)}
+{json_dumps(fields, indent=True)}
 ```
 
 ### Instructions:
@@ -167,36 +224,66 @@ Please confirm before making changes.
 @frappe.whitelist()
 def validate_json_for_customizations(doctype_name, json_str):
     """Validate JSON before applying as customizations - checks all fields, rejects all if any invalid"""
+    fields, errors = _parse_and_validate(json_str, doctype_name)
+    
+    # Return results
+    if errors:
+        return {
+            "success": False, 
+            "errors": errors,
+            "total_errors": len(errors)
+        }
+    else:
+        # Build structure preview
+        structure = build_structure_preview(fields)
+        return {
+            "success": True,
+            "message": f"✅ All {len(fields)} fields validated successfully",
+            "structure_html": structure
+        }
+
+
+@frappe.whitelist()
+def apply_customizations(doctype_name, json_str):
+    """Validate JSON and apply it as Property Setters, parsing it only once"""
+    fields, errors = _parse_and_validate(json_str, doctype_name)
+    
+    if errors:
+        return {
+            "success": False, 
+            "errors": errors,
+            "total_errors": len(errors)
+        }
+    
+    return _update_properties(doctype_name, fields)
+
+
+def _parse_and_validate(json_str, doctype_name):
+    """Parse the submitted JSON and validate it against the DocType. Returns (fields, errors)"""
     errors = []
     
     # Parse JSON
     try:
-        fields = json.loads(json_str)
+        fields = json_loads(json_str)
     except json.JSONDecodeError as e:
-        return {"success": False, "errors": [f"Invalid JSON syntax: {str(e)}"]}
+        return None, [f"Invalid JSON syntax: {str(e)}"]
     
     # Check structure
     if not isinstance(fields, list):
-        return {"success": False, "errors": ["JSON must be an array of field objects"]}
+        return None, ["JSON must be an array of field objects"]
     
     # Get base meta to check against
     try:
         base_meta = frappe.get_meta(doctype_name)
     except Exception as e:
-        return {"success": False, "errors": [f"Cannot load DocType '{doctype_name}': {str(e)}"]}
+        return None, [f"Cannot load DocType '{doctype_name}': {str(e)}"]
     
-    base_fieldnames = [f.fieldname for f in base_meta.fields]
+    base_fieldnames = {f.fieldname for f in base_meta.fields}
     
-    # Valid fieldtypes
-    valid_fieldtypes = [
-        "Data", "Text", "Small Text", "Text Editor", "Code", "Select", "Link", 
-        "Dynamic Link", "Check", "Int", "Float", "Currency", "Date", "Time", 
-        "Datetime", "Duration", "Password", "Percent", "Long Text", "HTML", 
-        "Markdown Editor", "Attach", "Attach Image", "Signature", "Color", 
-        "Barcode", "Geolocation", "HTML Editor", "Read Only", "Button",
-        "Table", "Table MultiSelect", "Section Break", "Column Break", "Tab Break",
-        "Heading", "Image", "Fold", "Rating", "Icon", "Autocomplete", "JSON"
-    ]
+    # Count fieldnames once for the duplicate check and deleted-field diff
+    fieldname_counts = Counter(
+        f.get("fieldname") for f in fields if isinstance(f, dict) and f.get("fieldname")
+    )
     
     # Validate each field
     for idx, field in enumerate(fields):
@@ -217,108 +304,159 @@ def validate_json_for_customizations(doctype_name, json_str):
             continue
         
         # Check fieldtype validity
-        if fieldtype not in valid_fieldtypes:
+        if not isinstance(fieldtype, str) or fieldtype not in VALID_FIELDTYPES:
             errors.append(f"Field {idx} ({fieldname}): Invalid fieldtype '{fieldtype}'")
         
         # Check for duplicate fieldnames in this submission
-        fieldnames_in_submission = [f.get("fieldname") for f in fields if f.get("fieldname")]
-        if fieldnames_in_submission.count(fieldname) > 1:
+        if fieldname_counts[fieldname] > 1:
             errors.append(f"Field {idx} ({fieldname}): Duplicate fieldname in submission")
     
     # Check for deleted core fields (fields in base but not in submission)
-    edited_fieldnames = [f.get("fieldname") for f in fields if f.get("fieldname")]
-    deleted_fields = set(base_fieldnames) - set(edited_fieldnames)
+    deleted_fields = base_fieldnames - fieldname_counts.keys()
     
     if deleted_fields:
         errors.append(f"Cannot delete core fields: {', '.join(sorted(deleted_fields))}. To hide them, set 'hidden': 1 instead.")
     
-    # Return results
-    if errors:
-        return {
-            "success": False, 
-            "errors": errors,
-            "total_errors": len(errors)
-        }
-    else:
-        # Build structure preview
-        structure = build_structure_preview(fields)
-        return {
-            "success": True,
-            "message": f"✅ All {len(fields)} fields validated successfully",
-            "structure_html": structure
-        }
+    return fields, errors
 
 
 @frappe.whitelist()
 def update_properties(doctype_name, json_str):
     """Apply validated JSON as Property Setters - assumes validation already passed"""
     try:
-        fields = json.loads(json_str)
+        fields = json_loads(json_str)
     except json.JSONDecodeError as e:
         frappe.throw(f"Invalid JSON: {str(e)}")
     
+    return _update_properties(doctype_name, fields)
+
+
+def _update_properties(doctype_name, fields):
+    """Create/update Property Setters for an already parsed fields list"""
     # Get current meta
     base_meta = frappe.get_meta(doctype_name)
+    base_by_fieldname = {f.fieldname: f for f in base_meta.fields}
     
-    # Track changes
-    updated_count = 0
-    created_count = 0
+    # Load all existing Property Setters for the submitted fields in one query
+    fieldnames = [f.get("fieldname") for f in fields if f.get("fieldname")]
+    existing_setters = get_existing_property_setters(doctype_name, fieldnames)
+    
+    # Collect changes, then write them in bulk
+    to_update = {}
+    to_insert = {}
     
-    # Apply each field's properties
     for field in fields:
         fieldname = field.get("fieldname")
         if not fieldname:
             continue
         
-        # Get base field if exists
-        base_field = None
-        for f in base_meta.fields:
-            if f.fieldname == fieldname:
-                base_field = f
-                break
+        # Get base field as a plain dict if exists
+        base_field = base_by_fieldname.get(fieldname)
+        base_dict = base_field.as_dict() if base_field else {}
         
-        # Compare and create Property Setters for changed properties
-        for prop, value in field.items():
-            # Skip fieldname and fieldtype (can't be changed via Property Setter)
-            if prop in ["fieldname", "fieldtype"]:
-                continue
-            
-            # Check if property changed from base
-            base_value = getattr(base_field, prop, None) if base_field else None
-            
-            # If different from base, create/update Property Setter
-            if value != base_value:
-                # Check if Property Setter already exists
-                existing = frappe.db.exists("Property Setter", {
-                    "doc_type": doctype_name,
-                    "field_name": fieldname,
-                    "property": prop
-                })
-                
-                if existing:
-                    # Update existing
-                    ps = frappe.get_doc("Property Setter", existing)
-                    ps.value = str(value)
-                    ps.save()
-                    updated_count += 1
-                else:
-                    # Create new Property Setter
-                    frappe.get_doc({
-                        "doctype": "Property Setter",
-                        "doctype_or_field": "DocField",  # Required: indicates this is a field property
-                        "doc_type": doctype_name,
-                        "field_name": fieldname,
-                        "property": prop,
-                        "value": str(value),
-                        "property_type": get_property_type(value)
-                    }).insert()
-                    created_count += 1
+        # Properties that differ from base; fieldname and fieldtype can't be
+        # changed via Property Setter
+        changed = {
+            prop: value for prop, value in field.items()
+            if prop not in ("fieldname", "fieldtype") and value != base_dict.get(prop)
+        }
+        
+        # Collect Property Setters for changed properties
+        for prop, value in changed.items():
+            existing = existing_setters.get((fieldname, prop))
+            if existing:
+                if existing.value != str(value):
+                    to_update[existing.name] = {"value": str(value)}
+            else:
+                # Same naming as Property Setter.autoname
+                name = f"{doctype_name}-{fieldname}-{prop}"
+                to_insert[name] = (
+                    name, "DocField", doctype_name, fieldname, prop,
+                    str(value), get_property_type(value)
+                )
+    
+    # Large change sets are written by a background job so the request returns right away
+    if len(to_update) + len(to_insert) > ASYNC_APPLY_THRESHOLD:
+        job_id = f"layout-apply-{doctype_name}"
+        job = frappe.enqueue(
+            "nce.wp_sync.doctype.layout_editor.layout_editor._apply_property_setters_async",
+            queue="long",
+            job_id=job_id,
+            deduplicate=True,
+            doctype_name=doctype_name,
+            to_update=to_update,
+            to_insert=list(to_insert.values()),
+            user=frappe.session.user
+        )
+        if job is None:
+            # Deduplicated: an apply for this DocType is still queued or running
+            return {
+                "success": False,
+                "message": f"Customizations for {doctype_name} are already being applied in the background. "
+                           "Wait for that to finish, then apply your changes again."
+            }
+        return {
+            "success": True,
+            "async": True,
+            "job_id": job_id,
+            "message": f"⏳ Applying {len(to_insert)} new and {len(to_update)} updated customizations in the background"
+        }
+    
+    return _write_property_setters(doctype_name, to_update, list(to_insert.values()))
+
+
+def _apply_property_setters_async(doctype_name, to_update, to_insert, user):
+    """Background job: write collected Property Setter changes and notify the user"""
+    try:
+        result = _write_property_setters(doctype_name, to_update, to_insert)
+    except Exception as e:
+        frappe.log_error(title=f"Layout Editor: apply failed for {doctype_name}")
+        # The page waits for this event, so report failures too
+        result = {"success": False, "error": str(e) or type(e).__name__}
+    frappe.publish_realtime(
+        "layout_apply_done",
+        {"doctype_name": doctype_name, **result},
+        user=user
+    )
+
+
+def _write_property_setters(doctype_name, to_update, to_insert):
+    """Bulk-write Property Setter updates ({name: {"value": ...}}) and new rows, then commit once"""
+    if to_update:
+        frappe.db.bulk_update("Property Setter", to_update, chunk_size=100)
+    
+    if to_insert:
+        now = now_datetime()
+        user = frappe.session.user
+        frappe.db.bulk_insert(
+            "Property Setter",
+            fields=[
+                "name", "doctype_or_field", "doc_type", "field_name", "property",
+                "value", "property_type", "creation", "modified", "owner", "modified_by"
+            ],
+            values=[tuple(row) + (now, now, user, user) for row in to_insert],
+            chunk_size=100
+        )
+    
+    updated_count = len(to_update)
+    created_count = len(to_insert)
+    
+    # Bulk writes skip PropertySetter.validate, so check the resulting
+    # layout the same way it would before committing anything
+    try:
+        validate_fields_for_doctype(doctype_name)
+    except Exception:
+        frappe.db.rollback()
+        # Drop any meta built from the rolled-back changes
+        frappe.clear_cache(doctype=doctype_name)
+        raise
     
     # Commit changes
     frappe.db.commit()
     
     # Clear cache to reflect changes
     frappe.clear_cache(doctype=doctype_name)
+    frappe.cache().delete_value(LAYOUT_JSON_CACHE_KEY.format(doctype_name))
     
     return {
         "success": True,
@@ -328,6 +466,21 @@ def update_properties(doctype_name, json_str):
     }
 
 
+def get_existing_property_setters(doctype_name, fieldnames):
+    """Fetch existing field Property Setters in one query, keyed by (fieldname, property)"""
+    if not fieldnames:
+        return {}
+    
+    return {
+        (ps.field_name, ps.property): ps
+        for ps in frappe.get_all(
+            "Property Setter",
+            filters={"doc_type": doctype_name, "field_name": ("in", list(fieldnames))},
+            fields=["name", "field_name", "property", "value"]
+        )
+    }
+
+
 def get_property_type(value):
     """Determine property type for Property Setter"""
     if isinstance(value, bool) or value in [0, 1]:
@@ -361,7 +514,7 @@ def save_field_changes(doctype_name, changes):
     # Parse if string
     if isinstance(changes, str):
         try:
-            changes = json.loads(changes)
+            changes = json_loads(changes)
         except json.JSONDecodeError as e:
             frappe.throw(f"Invalid changes JSON: {str(e)}")
     
@@ -372,6 +525,7 @@ def save_field_changes(doctype_name, changes):
         frappe.throw(f"Cannot load DocType '{doctype_name}': {str(e)}")
     
     base_fieldnames = {f.fieldname: f for f in base_meta.fields}
+    existing_setters = get_existing_property_setters(doctype_name, changes.keys())
     
     # Track changes
     created_count = 0
@@ -395,15 +549,11 @@ def save_field_changes(doctype_name, changes):
             
             try:
                 # Check if Property Setter already exists
-                existing = frappe.db.exists("Property Setter", {
-                    "doc_type": doctype_name,
-                    "field_name": fieldname,
-                    "property": prop
-                })
+                existing = existing_setters.get((fieldname, prop))
                 
                 if existing:
                     # Update existing Property Setter
-                    ps = frappe.get_doc("Property Setter", existing)
+                    ps = frappe.get_doc("Property Setter", existing.name)
                     old_value = ps.value
                     ps.value = str(value)
                     ps.property_type = get_property_type(value)
@@ -434,6 +584,7 @@ def save_field_changes(doctype_name, changes):
     
     # Clear cache to reflect changes immediately
     frappe.clear_cache(doctype=doctype_name)
+    frappe.cache().delete_value(LAYOUT_JSON_CACHE_KEY.format(doctype_name))
     
     # Build response
     total_changes = created_count + updated_count
@@ -461,42 +612,34 @@ def save_field_changes(doctype_name, changes):
 
 def build_structure_preview(fields):
     """Build an HTML preview of the layout structure"""
-    html = ['<div style="font-family: monospace; font-size: 12px; line-height: 1.6;">']
-    
-    current_tab = "Default"
-    current_section = None
-    in_column = False
-    indent = 0
+    return "".join(_iter_structure(fields))
+
+
+def _iter_structure(fields):
+    """Yield the HTML fragments of the structure preview"""
+    yield _PREVIEW_OPEN
+    m_sec, m_col, m_fld = _MARGINS[0]
     
     for field in fields:
         ft = field.get("fieldtype", "")
         fn = field.get("fieldname", "")
         label = field.get("label", fn)
         hidden = field.get("hidden", 0)
-        
-        style = "color: #888;" if hidden else ""
-        hidden_badge = ' <span style="color: red; font-size: 10px;">[HIDDEN]</span>' if hidden else ""
+        hidden_badge = _HIDDEN_BADGE if hidden else ""
         
         if ft == "Tab Break":
-            current_tab = label or fn
-            html.append(f'<div style="margin-top: 10px; font-weight: bold; color: #2196F3;">📑 TAB: {label}{hidden_badge}</div>')
-            indent = 1
+            yield _TAB_TMPL.format(label, hidden_badge)
+            m_sec, m_col, m_fld = _MARGINS[1]
             
         elif ft == "Section Break":
-            current_section = label or fn
             collapsible = " (collapsible)" if field.get("collapsible") else ""
-            html.append(f'<div style="margin-top: 8px; margin-left: {indent*20}px; font-weight: bold; color: #4CAF50;">📁 SECTION: {label}{collapsible}{hidden_badge}</div>')
+            yield _SECTION_TMPL.format(m_sec, label, collapsible, hidden_badge)
             
         elif ft == "Column Break":
-            html.append(f'<div style="margin-left: {indent*20 + 20}px; color: #FF9800;">│ ── COLUMN BREAK ──</div>')
+            yield _COLUMN_TMPL.format(m_col)
             
         else:
             # Regular field
-            html.append(f'<div style="margin-left: {indent*20 + 40}px; {style}">• {label} <span style="color: #999;">({ft})</span>{hidden_badge}</div>')
+            yield _FIELD_TMPL.format(m_fld, "color: #888;" if hidden else "", label, ft, hidden_badge)
     
-    html.append('</div>')
-    return "\n".join(html)
-
-
-
-
+    yield '</div>'
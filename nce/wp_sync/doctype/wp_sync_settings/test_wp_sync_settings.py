@@ -0,0 +1,51 @@
+# Copyright (c) 2025, NCE and contributors
+# For license information, please see license.txt
+
+import datetime
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import (
+    escape_wp_value,
+    quote_wp_identifier,
+    quote_wp_table,
+)
+
+
+class TestWPQueryEscaping(FrappeTestCase):
+    """Identifiers and values bound into WordPress queries"""
+
+    def test_quote_identifier(self):
+        self.assertEqual(quote_wp_identifier("wp_users"), "`wp_users`")
+        self.assertEqual(quote_wp_identifier("odd`name"), "`odd``name`")
+        self.assertEqual(quote_wp_identifier("a" * 64), "`{0}`".format("a" * 64))
+
+    def test_invalid_identifier(self):
+        for name in (None, "", "a" * 65, "bad\0name"):
+            with self.subTest(name=name):
+                with self.assertRaises(frappe.ValidationError):
+                    quote_wp_identifier(name)
+
+    def test_quote_table(self):
+        self.assertEqual(quote_wp_table("wp_users"), "`wp_users`")
+        self.assertEqual(quote_wp_table("wpdb.wp_users"), "`wpdb`.`wp_users`")
+        self.assertEqual(quote_wp_table("a.b.c"), "`a`.`b.c`")
+        with self.assertRaises(frappe.ValidationError):
+            quote_wp_table("")
+
+    def test_escape_value(self):
+        self.assertEqual(escape_wp_value(None), "NULL")
+        self.assertEqual(escape_wp_value(True), "1")
+        self.assertEqual(escape_wp_value(False), "0")
+        self.assertEqual(escape_wp_value(42), "42")
+        self.assertEqual(escape_wp_value(1.5), "1.5")
+        self.assertEqual(escape_wp_value(datetime.datetime(2024, 5, 6, 7, 8, 9)), "'2024-05-06 07:08:09'")
+        self.assertEqual(escape_wp_value(datetime.date(2024, 5, 6)), "'2024-05-06'")
+
+    def test_escape_string(self):
+        self.assertEqual(escape_wp_value("plain"), "'plain'")
+        self.assertEqual(escape_wp_value("100%"), "'100%'")
+        quoted = escape_wp_value("it's")
+        self.assertTrue(quoted.startswith("'") and quoted.endswith("'"))
+        self.assertNotIn("it's", quoted)
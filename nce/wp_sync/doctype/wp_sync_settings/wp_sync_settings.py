@@ -7,8 +7,26 @@ Handles WordPress REST API connection settings and testing.
 import frappe
 from frappe.model.document import Document
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
+import datetime
 import json
+import threading
+from functools import lru_cache
+
+
+# One HTTP session per thread so TCP/TLS connections to WordPress are kept
+# alive and reused across queries instead of re-handshaking every call.
+_local = threading.local()
+
+# Headers that are the same for every request; set once on each session
+_SESSION_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "curl/8.7.1",
+    "Accept": "*/*",
+    "Connection": "keep-alive"
+}
 
 
 class WPSyncSettings(Document):
@@ -27,28 +45,101 @@ class WPSyncSettings(Document):
             # Test with a simple query
             result = execute_wp_query("SELECT 1 as test")
             if result and len(result) > 0:
-                self.connection_status = "Connected Successfully"
-                self.save()
+                self.set_connection_status("Connected Successfully")
                 return {"success": True, "message": "Connection successful!"}
             else:
                 raise Exception("Empty response from API")
         except Exception as e:
-            self.connection_status = f"Failed: {str(e)[:100]}"
-            self.save()
+            self.set_connection_status(f"Failed: {str(e)[:100]}")
             return {"success": False, "message": str(e)}
 
+    def set_connection_status(self, status):
+        """Write connection_status directly, without a full document save."""
+        self.connection_status = status
+        frappe.db.set_value(self.doctype, self.name, "connection_status", status, update_modified=False)
+
 
 def get_wp_settings():
     """Get WP Sync Settings singleton."""
     return frappe.get_single("WP Sync Settings")
 
 
-def execute_wp_query(sql_query):
+def get_wp_session():
+    """Get the keep-alive requests.Session for the current thread."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+        session.headers.update(_SESSION_HEADERS)
+        # The endpoint only runs read queries, so POSTs are safe to retry
+        # when a proxy in front of WordPress reports a transient failure.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=8)
+def _get_auth_header(site, modified):
+    """
+    Build the Basic Auth header for the current settings.
+
+    Keyed on site and the settings' modified timestamp, so saving new
+    credentials invalidates it without decrypting the password per query.
+    """
+    settings = get_wp_settings()
+    credentials = f"{settings.wp_username}:{settings.get_password('wp_app_password')}"
+    return f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+
+def quote_wp_identifier(name):
+    """Backquote a table/column name for a WordPress query."""
+    if not name or len(name) > 64 or "\0" in name:
+        frappe.throw(f"Invalid SQL identifier: {name!r}")
+    return "`{0}`".format(name.replace("`", "``"))
+
+
+def quote_wp_table(name):
+    """Backquote a table name for a WordPress query; "schema.table" is quoted per part."""
+    if not name:
+        frappe.throw(f"Invalid SQL identifier: {name!r}")
+    return ".".join(quote_wp_identifier(part) for part in name.split(".", 1))
+
+
+def escape_wp_value(value):
+    """Render a Python value as a MySQL literal for a WordPress query."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime.datetime):
+        return value.strftime("'%Y-%m-%d %H:%M:%S'")
+    if isinstance(value, datetime.date):
+        return value.strftime("'%Y-%m-%d'")
+    return frappe.db.escape(str(value), percent=False)
+
+
+def execute_wp_query(sql_query, params=None):
     """
     Execute a SQL query via WordPress REST API.
     
+    The endpoint only accepts a SQL string, so params are escaped and bound
+    client-side into %s placeholders (literal % must then be written %%).
+    
     Args:
         sql_query (str): SELECT or CALL SQL query to execute
+        params (list|tuple): Optional values for %s placeholders
     
     Returns:
         list: List of dictionaries with query results
@@ -56,7 +147,7 @@ def execute_wp_query(sql_query):
     Raises:
         Exception: If API call fails or returns error
     """
-    settings = get_wp_settings()
+    settings = frappe.get_cached_doc("WP Sync Settings")
 
     if not settings.wp_site_url:
         frappe.throw("WordPress REST API settings not configured")
@@ -64,27 +155,19 @@ def execute_wp_query(sql_query):
     # Build endpoint URL
     endpoint = f"{settings.wp_site_url}/wp-json/custom/v1/sql-query"
 
-    # Build Basic Auth header
-    username = settings.wp_username
-    password = settings.get_password("wp_app_password")
-    credentials = f"{username}:{password}"
-    encoded_credentials = base64.b64encode(credentials.encode()).decode()
-    
+    if params is not None:
+        sql_query = sql_query % tuple(escape_wp_value(value) for value in params)
+
     # Prepare request payload as JSON string
     payload_str = json.dumps({"sql": sql_query})
 
     # Make API request
     try:
-        response = requests.post(
+        response = get_wp_session().post(
             endpoint,
             data=payload_str,  # Send as raw string, not json=
             timeout=30,
-            headers={
-                "Content-Type": "application/json",
-                "User-Agent": "curl/8.7.1",
-                "Accept": "*/*",
-                "Authorization": f"Basic {encoded_credentials}"
-            },
+            headers={"Authorization": _get_auth_header(frappe.local.site, settings.modified)},
             verify=True
         )
 
@@ -4,7 +4,6 @@ WP Sync Task DocType Controller
 Defines individual sync tasks between WordPress and Frappe.
 """
 
-import json
 import frappe
 from frappe.model.document import Document
 from frappe.utils import now_datetime
@@ -15,20 +14,22 @@ class WPSyncTask(Document):
 
     def validate(self):
         """Validate the task configuration."""
-        # Validate JSON field mapping
-        if self.field_mapping:
-            try:
-                mapping = json.loads(self.field_mapping)
-                if not isinstance(mapping, dict):
-                    frappe.throw("Field mapping must be a JSON object (dictionary)")
-            except json.JSONDecodeError as e:
-                frappe.throw(f"Invalid JSON in field mapping: {e}")
+        # Validate field mapping rows
+        seen = set()
+        for row in self.field_map:
+            if row.wp_column in seen:
+                frappe.throw(f"WP column '{row.wp_column}' is mapped more than once")
+            seen.add(row.wp_column)
+        if sum(1 for row in self.field_map if row.is_key) > 1:
+            frappe.throw("Only one field mapping row can be marked as key")
 
     def get_field_mapping(self):
         """Get field mapping as a Python dictionary."""
-        if self.field_mapping:
-            return json.loads(self.field_mapping)
-        return {}
+        return {row.wp_column: row.frappe_field for row in self.field_map}
+
+    def get_key_column(self):
+        """Get the WP column marked as key in the field mapping, if any."""
+        return next((row.wp_column for row in self.field_map if row.is_key), None)
 
     @frappe.whitelist()
     def run_now(self):
@@ -39,10 +40,13 @@ class WPSyncTask(Document):
         return result
 
     def update_status(self, status, rows=0, error=None):
-        """Update the task status after execution."""
-        self.last_run_at = now_datetime()
-        self.last_run_status = status
-        self.rows_synced = rows
-        self.last_error = error[:500] if error else None
-        self.save(ignore_permissions=True)
+        """Update the task status after execution in a single UPDATE (no save/commit)."""
+        values = {
+            "last_run_at": now_datetime(),
+            "last_run_status": status,
+            "rows_synced": rows,
+            "last_error": error[:500] if error else None
+        }
+        self.update(values)
+        frappe.db.set_value(self.doctype, self.name, values, update_modified=False)
 
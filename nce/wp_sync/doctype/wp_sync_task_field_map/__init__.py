@@ -0,0 +1 @@
+# WP Sync Task Field Map DocType
@@ -0,0 +1,13 @@
+"""
+WP Sync Task Field Map DocType Controller
+
+One WordPress column -> Frappe field mapping row of a WP Sync Task.
+"""
+
+import frappe
+from frappe.model.document import Document
+
+
+class WPSyncTaskFieldMap(Document):
+    """Child table row mapping a WordPress column to a Frappe field."""
+    pass
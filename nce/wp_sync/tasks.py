@@ -5,51 +5,119 @@ Scheduled and on-demand sync tasks for WordPress → Frappe data synchronization
 """
 
 import json
-import frappe
-from frappe.utils import now_datetime, add_to_date, get_datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 
-from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import execute_wp_query, get_wp_settings
+import frappe
+from frappe.model import default_fields
+from frappe.utils import cint, now_datetime, add_to_date, get_datetime
+
+from nce.wp_sync.doctype.wp_sync_settings.wp_sync_settings import (
+    execute_wp_query,
+    get_wp_settings,
+    quote_wp_identifier,
+    quote_wp_table
+)
 from nce.wp_sync.doctype.wp_sync_log.wp_sync_log import create_sync_log
+from nce.wp_sync.utils import json_dumps, row_hash
 
 
-def build_incremental_where_clause(task):
+# Upper bound on tasks run concurrently by run_tasks_parallel(). Each worker
+# thread holds its own Frappe DB connection and WordPress HTTP session.
+MAX_PARALLEL_TASKS = 4
+
+# Savepoints used to retry a failed bulk batch row by row
+_BATCH_SAVEPOINT = "wp_sync_batch"
+_ROW_SAVEPOINT = "wp_sync_row"
+
+
+def get_incremental_cutoff(task):
     """
-    Build WHERE clause for incremental sync based on updated_at field.
-    
+    Get the updated_at cutoff for an incremental sync.
+
     Args:
         task: WP Sync Task document
-    
+
     Returns:
-        str: WHERE clause condition or empty string
+        datetime: last_run_at minus the buffer, or None when no incremental
+                  filter applies
     """
     # Check if incremental sync is enabled and configured
     if not task.use_incremental_sync:
-        return ""
+        return None
     
     if not task.updated_at_field:
-        return ""
+        return None
     
     if not task.last_run_at:
         # First run - no incremental filter
-        return ""
+        return None
     
     # Calculate cutoff time with buffer
     buffer_minutes = task.sync_buffer_minutes or 5
-    cutoff_time = add_to_date(task.last_run_at, minutes=-buffer_minutes)
+    return add_to_date(get_datetime(task.last_run_at), minutes=-buffer_minutes)
+
+
+def build_incremental_where_clause(task):
+    """
+    Build WHERE clause for incremental sync based on updated_at field.
     
-    # Format timestamp for SQL
-    cutoff_str = cutoff_time.strftime("%Y-%m-%d %H:%M:%S")
+    Args:
+        task: WP Sync Task document
     
-    # Build the condition
-    condition = f"{task.updated_at_field} >= '{cutoff_str}'"
+    Returns:
+        tuple: (condition with a %s placeholder, params), or ("", []) when
+               no incremental filter applies
+    """
+    cutoff_time = get_incremental_cutoff(task)
+    if cutoff_time is None:
+        return "", []
     
-    return condition
+    # Compare the column against a plain DATETIME literal (no string casts
+    # on the column side, so an index on it stays usable)
+    condition = f"{quote_wp_identifier(task.updated_at_field)} >= %s"
+    
+    return condition, [cutoff_time]
+
+
+def has_changes_since_cutoff(task):
+    """
+    Check whether the source table has rows updated since the incremental cutoff.
+
+    A single MAX() over the updated_at column (served from its index) lets
+    quiet tables skip the sync query entirely. Returns True when there is
+    no cutoff to compare against.
+    """
+    cutoff_time = get_incremental_cutoff(task)
+    if cutoff_time is None:
+        return True
+
+    result = execute_wp_query(
+        "SELECT MAX({0}) AS max_updated FROM {1}".format(
+            quote_wp_identifier(task.updated_at_field),
+            quote_wp_table(task.source_table)
+        )
+    )
+    max_updated = result[0].get("max_updated") if result else None
+    if not max_updated:
+        return False
+    # Zero dates ('0000-00-00 00:00:00', common in WordPress) and other
+    # unparseable values can't prove the table is quiet - sync as usual
+    try:
+        max_updated = get_datetime(max_updated)
+    except Exception:
+        return True
+    return max_updated is None or max_updated >= cutoff_time
 
 
 def run_scheduled_sync():
     """
-    Run all enabled sync tasks in order.
+    Run all enabled sync tasks.
     Called by the scheduler (configured in hooks.py).
+
+    Tasks are grouped by target DocType so tasks writing the same table run
+    one after another in execution order; the groups run in parallel.
     """
     settings = get_wp_settings()
 
@@ -62,7 +130,7 @@ def run_scheduled_sync():
     tasks = frappe.get_all(
         "WP Sync Task",
         filters={"enabled": 1},
-        fields=["name"],
+        fields=["name", "source_table", "target_doctype"],
         order_by="execution_order asc"
     )
 
@@ -70,16 +138,33 @@ def run_scheduled_sync():
         frappe.logger().info("WP Sync: No enabled tasks found")
         return
 
+    # Fetch the structure of every source table in one WordPress query up
+    # front, so each task's schema sync is served from the column cache
+    try:
+        from nce.wp_sync.api import prefetch_wp_table_columns
+        prefetch_wp_table_columns(
+            t.source_table for t in tasks if t.target_doctype != "WP Table Data"
+        )
+    except Exception as e:
+        # Not fatal - each task falls back to fetching its own columns
+        frappe.logger().warning(f"WP Sync: Could not prefetch table columns: {e}")
+
     frappe.logger().info(f"WP Sync: Starting scheduled sync with {len(tasks)} tasks")
 
+    groups = group_tasks_by_target(tasks)
+
     results = []
-    for task in tasks:
-        result = run_single_task(task.name)
-        results.append(result)
+    group_results = run_task_groups_parallel(
+        groups,
+        max_workers=cint(settings.max_parallel_tasks) or MAX_PARALLEL_TASKS
+    )
+    for task_names, group_result in zip(groups, group_results):
+        for task_name, result in zip(task_names, group_result):
+            results.append(result)
 
-        # If a task fails, continue with others (can be made configurable)
-        if result.get("status") == "Failed":
-            frappe.logger().error(f"WP Sync: Task {task.name} failed: {result.get('error')}")
+            # If a task fails, continue with others (can be made configurable)
+            if result.get("status") == "Failed":
+                frappe.logger().error(f"WP Sync: Task {task_name} failed: {result.get('error')}")
 
     # Update last sync time in settings
     settings.last_sync_at = now_datetime()
@@ -101,8 +186,8 @@ def run_single_task(task_name):
     """
     task = frappe.get_doc("WP Sync Task", task_name)
 
-    # Create log entry
-    log = create_sync_log(task_name)
+    # Create log entry (committed, so it survives a rollback of a failed sync)
+    log = create_sync_log(task_name, commit=True)
 
     try:
         # Determine sync direction
@@ -120,6 +205,7 @@ def run_single_task(task_name):
             rows_inserted=result.get("rows_inserted", 0),
             rows_updated=result.get("rows_updated", 0),
             rows_skipped=result.get("rows_skipped", 0),
+            rows_failed=result.get("rows_failed", 0),
         )
 
         # Update task status
@@ -129,6 +215,8 @@ def run_single_task(task_name):
 
     except Exception as e:
         error_msg = str(e)
+        # Discard the failed run's uncommitted writes (e.g. a Clear & Import DELETE)
+        frappe.db.rollback()
         frappe.log_error(f"WP Sync Task Failed: {task_name}\n{error_msg}", "WP Sync Error")
 
         # Update log with failure
@@ -143,6 +231,104 @@ def run_single_task(task_name):
         return {"status": "Failed", "error": error_msg}
 
 
+def group_tasks_by_target(tasks):
+    """
+    Group tasks by target DocType, keeping their order within each group.
+
+    Tasks writing the same DocType must not run at the same time (schema
+    sync saves the DocType, Clear & Import deletes its rows).
+
+    Args:
+        tasks: Dicts with name and target_doctype, in the order to run them
+
+    Returns:
+        list: Lists of task names; groups are in order of first appearance
+    """
+    groups = {}
+    for task in tasks:
+        groups.setdefault(task.target_doctype, []).append(task.name)
+    return list(groups.values())
+
+
+def run_tasks_parallel(task_names, max_workers=MAX_PARALLEL_TASKS):
+    """
+    Run sync tasks concurrently in worker threads.
+
+    Tasks spend most of their time waiting on WordPress and the database,
+    so running them side by side overlaps that wait. Tasks with the same
+    target DocType run one after another in the given order.
+
+    Args:
+        task_names: Names of WP Sync Tasks
+        max_workers: Maximum number of task groups to run at once
+
+    Returns:
+        list: Results in the same order as task_names
+    """
+    targets = dict(frappe.get_all(
+        "WP Sync Task",
+        filters={"name": ["in", task_names]},
+        fields=["name", "target_doctype"],
+        as_list=True
+    )) if task_names else {}
+    groups = group_tasks_by_target(
+        frappe._dict(name=task_name, target_doctype=targets.get(task_name)) for task_name in task_names
+    )
+
+    results = {}
+    for group, group_results in zip(groups, run_task_groups_parallel(groups, max_workers)):
+        results.update(zip(group, group_results))
+    return [results[task_name] for task_name in task_names]
+
+
+def run_task_groups_parallel(task_groups, max_workers=MAX_PARALLEL_TASKS):
+    """
+    Run groups of sync tasks concurrently, each group sequentially in its own thread.
+
+    Args:
+        task_groups: Lists of WP Sync Task names; tasks within a list run in order
+        max_workers: Maximum number of groups to run at once
+
+    Returns:
+        list: One list of results per group, in the same order as task_groups
+    """
+    if len(task_groups) <= 1:
+        return [[run_single_task(task_name) for task_name in group] for group in task_groups]
+
+    run = partial(
+        _run_tasks_in_thread,
+        frappe.local.site,
+        frappe.local.sites_path,
+        frappe.session.user
+    )
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(task_groups))) as executor:
+        return list(executor.map(run, task_groups))
+
+
+def _run_tasks_in_thread(site, sites_path, user, task_names):
+    """Run tasks one after another in a worker thread with its own Frappe context."""
+    results = []
+    try:
+        # Inside the try: a site/DB connection failure fails this group only
+        frappe.init(site=site, sites_path=sites_path)
+        frappe.connect()
+        frappe.set_user(user)
+        for task_name in task_names:
+            results.append(run_single_task(task_name))
+            # No request/job wrapper commits for us in a worker thread
+            frappe.db.commit()
+        return results
+    except Exception as e:
+        # Tasks that didn't get to run are reported as failed
+        failed = {"status": "Failed", "error": str(e)}
+        return results + [failed] * (len(task_names) - len(results))
+    finally:
+        try:
+            frappe.destroy()
+        except Exception:
+            pass
+
+
 def sync_wp_to_frappe(task):
     """
     Sync data from WordPress table to Frappe DocType via REST API.
@@ -163,77 +349,89 @@ def sync_wp_to_frappe(task):
                 f"WP Sync: Added {schema_result['fields_added']} new field(s) to {task.target_doctype}"
             )
     
+    # Nothing updated since the last run - skip the row query altogether
+    if not has_changes_since_cutoff(task):
+        return {"rows_processed": 0, "rows_inserted": 0, "rows_updated": 0, "rows_skipped": 0}
+
     # Handle Full Sync with "Clear & Import" mode
     # Only clear if NOT using incremental sync AND mode is "Clear & Import"
     if not task.use_incremental_sync and task.full_sync_mode == "Clear & Import":
+        # Committed together with the first batch, so a sync that fails
+        # before writing anything leaves the existing records in place
         frappe.db.sql("DELETE FROM `tab{0}`".format(task.target_doctype))
-        frappe.db.commit()
         frappe.logger().info(f"WP Sync: Cleared all records from {task.target_doctype}")
     
+    # Get field mapping
+    field_mapping = task.get_field_mapping()
+
+    # Check if syncing to generic WP Table Data
+    is_generic = task.target_doctype == "WP Table Data"
+
+    # Id column known before querying: configured, marked as key in the
+    # mapping, or mapped to the key field
+    key_field = "record_id" if is_generic else "track_record_id"
+    id_column = task.source_primary_key or task.get_key_column() or next(
+        (wp_col for wp_col, frappe_field in field_mapping.items() if frappe_field == key_field),
+        None
+    )
+
+    # With an explicit mapping and a known id column, only fetch those columns
+    # so unmapped (often large TEXT) columns aren't sent over the wire.
+    # Generic storage and auto-mapping need every column.
+    select_clause = "*"
+    if not is_generic and field_mapping and id_column:
+        select_columns = sorted({id_column, *field_mapping})
+        select_clause = ", ".join(quote_wp_identifier(col) for col in select_columns)
+
     # Build query
-    query = f"SELECT * FROM {task.source_table}"
+    query = f"SELECT {select_clause} FROM {quote_wp_table(task.source_table)}"
     
-    # Collect WHERE conditions
+    # Collect WHERE conditions and their bound values
     where_conditions = []
+    params = []
     
-    # Add user-defined WHERE clause
+    # Add user-defined WHERE clause (raw SQL by design; % escaped for binding)
     if task.where_clause:
-        where_conditions.append(f"({task.where_clause})")
+        where_conditions.append("({0})".format(task.where_clause.replace("%", "%%")))
     
     # Add incremental sync condition (only if incremental is enabled)
-    incremental_condition = build_incremental_where_clause(task)
+    incremental_condition, incremental_params = build_incremental_where_clause(task)
     if incremental_condition:
         where_conditions.append(f"({incremental_condition})")
+        params.extend(incremental_params)
     
-    # Combine conditions
-    if where_conditions:
-        query += " WHERE " + " AND ".join(where_conditions)
-
-    # Execute query via REST API
-    rows = execute_wp_query(query)
-
-    if not rows:
+    # Execute query via REST API; rows are consumed as a stream, fetched in
+    # keyset-paginated pages when enabled. Only the Source Primary Key is
+    # paginated on: keyset pages on a non-unique column would skip rows
+    # sharing a key across a page boundary.
+    rows = iter_wp_rows(query, where_conditions, params, task.source_primary_key, cint(task.chunk_rows))
+    first_row = next(rows, None)
+
+    if first_row is None:
         return {"rows_processed": 0, "rows_inserted": 0, "rows_updated": 0, "rows_skipped": 0}
 
-    # Get field mapping
-    field_mapping = task.get_field_mapping()
-
-    # Check if syncing to generic WP Table Data
-    is_generic = task.target_doctype == "WP Table Data"
+    rows = chain((first_row,), rows)
 
     # Auto-generate field mapping if not provided (for auto-created DocTypes)
     # Maps WP column names to lowercase Frappe field names (Frappe lowercases all fieldnames)
-    if not is_generic and (not field_mapping or len(field_mapping) == 0) and rows:
+    if not is_generic and (not field_mapping or len(field_mapping) == 0):
         field_mapping = {}
-        for col_name in rows[0].keys():
+        for col_name in first_row.keys():
             # Frappe lowercases all fieldnames, so we must too
             frappe_fieldname = col_name.lower()
             field_mapping[col_name] = frappe_fieldname
 
+    # Configured source_primary_key, the key row of the mapping, or the
+    # column mapped to the key field
+    source_id_field = id_column
+
     if is_generic:
-        # For generic storage, just need record_id mapping
-        source_id_field = task.source_primary_key or None
-        if not source_id_field:
-            for wp_col, frappe_field in field_mapping.items():
-                if frappe_field == "record_id":
-                    source_id_field = wp_col
-                    break
         if not source_id_field:
             source_id_field = "id"  # Default
     else:
-        # Use configured source_primary_key if set
-        source_id_field = task.source_primary_key or None
-        
-        # If not configured, try field mapping
-        if not source_id_field:
-            for wp_col, frappe_field in field_mapping.items():
-                if frappe_field == "track_record_id":
-                    source_id_field = wp_col
-                    break
-        
         # If still not found, auto-detect from column names
-        if not source_id_field and rows:
-            row_keys = list(rows[0].keys())
+        if not source_id_field:
+            row_keys = list(first_row.keys())
             # Try common ID column patterns
             for col in row_keys:
                 col_lower = col.lower()
@@ -244,41 +442,41 @@ def sync_wp_to_frappe(task):
             if not source_id_field:
                 source_id_field = row_keys[0]
 
+    rows_processed = 0
     rows_inserted = 0
     rows_updated = 0
     rows_skipped = 0
     
-    # Batch size for commits
+    # Batch size for bulk writes and commits
     BATCH_SIZE = 500
     
-    # Pre-fetch existing record IDs → names mapping (optimization)
-    # This avoids individual get_value() calls during updates
-    if not is_generic:
-        existing_map = {}  # {track_record_id: name}
-        existing_records = frappe.get_all(
-            task.target_doctype,
-            fields=["name", "track_record_id"],
-            limit=0  # No limit
-        )
-        for rec in existing_records:
-            if rec.track_record_id:
-                existing_map[str(rec.track_record_id)] = rec.name
-    else:
-        # For generic, fetch table_name + record_id combinations
-        existing_map = {}  # {record_id: name}
-        existing_records = frappe.get_all(
-            task.target_doctype,
-            filters={"table_name": task.source_table},
-            fields=["name", "record_id"],
-            limit=0
-        )
-        for rec in existing_records:
-            if rec.record_id:
-                existing_map[str(rec.record_id)] = rec.name
+    # Rows are buffered per batch; each batch looks up which source ids
+    # already exist with one IN query, then bulk writes inserts and updates
+    pending = {}  # {source_id: values}
+    row_errors = []
     
-    batch_count = 0
+    # Constant for the whole run - resolved once instead of per row
+    synced_at = now_datetime()
+    source_table = task.source_table
+    # Every row of one SELECT has the same columns, so the mapping is resolved
+    # against the first row once. The key field is set for inserts only.
+    # NULLs are skipped unless the mapping row says otherwise.
+    # Rows are bulk-written as SQL columns, so fields the DocType doesn't have
+    # (and standard fields like name/owner) are dropped here, as a Document
+    # insert/save would ignore them.
+    writable = frozenset() if is_generic else _get_writable_columns(task.target_doctype)
+    keep_nulls = {row.wp_column for row in task.field_map if not row.skip_if_null}
+    effective_mapping = tuple(
+        (wp_col, frappe_field, wp_col not in keep_nulls) for wp_col, frappe_field in field_mapping.items()
+        if wp_col in first_row and frappe_field in writable and frappe_field != "track_record_id"
+    )
+    # Mirror DocTypes created before track_row_hash existed are written as before
+    use_row_hash = "track_row_hash" in writable
+    set_source_table = "track_source_table" in writable
+    set_last_synced = "track_last_synced" in writable
     
     for row in rows:
+        rows_processed += 1
         try:
             source_id = str(row.get(source_id_field))
             if not source_id:
@@ -287,82 +485,442 @@ def sync_wp_to_frappe(task):
 
             if is_generic:
                 # Generic WP Table Data: use table_name + record_id as unique key
-                existing_name = existing_map.get(source_id)
-                
-                if existing_name:
-                    # Update existing record
-                    doc = frappe.get_doc(task.target_doctype, existing_name)
-                    doc.data = row  # Store all data in JSON field
-                    doc.synced_at = now_datetime()
-                    doc.save(ignore_permissions=True)
-                    rows_updated += 1
-                else:
-                    # Insert new record
-                    doc = frappe.get_doc({
-                        "doctype": task.target_doctype,
-                        "table_name": task.source_table,
-                        "record_id": source_id,
-                        "data": row,  # All WordPress columns as JSON
-                        "synced_at": now_datetime()
-                    })
-                    doc.insert(ignore_permissions=True)
-                    existing_map[source_id] = doc.name  # Track for subsequent rows
-                    rows_inserted += 1
+                values = {
+                    "data": json_dumps(row),  # All WordPress columns as JSON
+                    "synced_at": synced_at
+                }
             else:
-                # Specific DocType: use pre-fetched existing map
-                existing_name = existing_map.get(source_id)
-
-                # Build field values
-                values = {}
-                for wp_col, frappe_field in field_mapping.items():
-                    if wp_col in row:
-                        value = row[wp_col]
-                        # Handle None values
-                        if value is not None:
-                            values[frappe_field] = value
+                # Build field values, skipping None values where configured
+                values = {
+                    frappe_field: value for wp_col, frappe_field, skip_null in effective_mapping
+                    if (value := row[wp_col]) is not None or not skip_null
+                }
 
                 # Set tracking fields
-                values["track_source_table"] = task.source_table
-                values["track_last_synced"] = now_datetime()
-
-                if existing_name:
-                    # Update existing record (no extra get_value needed!)
-                    doc = frappe.get_doc(task.target_doctype, existing_name)
-                    for field, value in values.items():
-                        if field != "track_record_id":  # Don't update the key field
-                            setattr(doc, field, value)
-                    doc.save(ignore_permissions=True)
-                    rows_updated += 1
-                else:
-                    # Insert new record
-                    values["doctype"] = task.target_doctype
-                    values["track_record_id"] = source_id
-                    doc = frappe.get_doc(values)
-                    doc.insert(ignore_permissions=True)
-                    existing_map[source_id] = doc.name  # Track for subsequent rows
-                    rows_inserted += 1
-
-            # Commit in batches
-            batch_count += 1
-            if batch_count >= BATCH_SIZE:
-                frappe.db.commit()
-                batch_count = 0
+                if use_row_hash:
+                    values["track_row_hash"] = row_hash(values)
+                if set_source_table:
+                    values["track_source_table"] = source_table
+                if set_last_synced:
+                    values["track_last_synced"] = synced_at
+
+            if source_id in pending:
+                # Repeated source id within this batch - the later row replaces
+                # the earlier one outright (its hash covers exactly what's written)
+                rows_skipped += 1
+            pending[source_id] = values
+
+            # Write and commit in batches
+            if len(pending) >= BATCH_SIZE:
+                inserted, updated, unchanged = _flush_sync_batch(task, pending, row_errors)
+                rows_inserted += inserted
+                rows_updated += updated
+                rows_skipped += unchanged
 
         except Exception as e:
-            frappe.log_error(f"Error syncing row {row}: {str(e)}", "WP Sync Row Error")
+            row_errors.append({"source_id": row.get(source_id_field), "error": str(e)[:200]})
             rows_skipped += 1
 
-    # Final commit for remaining records
-    frappe.db.commit()
+    # Final write and commit for remaining records
+    inserted, updated, unchanged = _flush_sync_batch(task, pending, row_errors)
+    rows_inserted += inserted
+    rows_updated += updated
+    rows_skipped += unchanged
+
+    # One Error Log for all failed rows instead of one per row
+    if row_errors:
+        frappe.log_error(
+            title="WP Sync Row Errors",
+            message=json_dumps({
+                "task": task.name,
+                "count": len(row_errors),
+                "samples": row_errors[:20]
+            }, indent=True)
+        )
 
     return {
-        "rows_processed": len(rows),
+        "rows_processed": rows_processed,
         "rows_inserted": rows_inserted,
         "rows_updated": rows_updated,
-        "rows_skipped": rows_skipped
+        "rows_skipped": rows_skipped,
+        "rows_failed": len(row_errors)
     }
 
 
+def iter_wp_rows(query, where_conditions=None, params=None, key_column=None, chunk_rows=0):
+    """
+    Yield the rows of a WordPress query one at a time.
+
+    With a key_column and chunk_rows, the query is run as a series of short
+    keyset-paginated queries (key > last key ORDER BY key LIMIT chunk_rows)
+    instead of one unbounded SELECT; otherwise it runs once.
+
+    Each REST response is a single JSON document, so rows are handed out
+    (and dropped from the page) as they are consumed; rows already written by
+    a batch flush can then be freed.
+
+    Args:
+        query: SELECT ... FROM ... without a WHERE clause
+        where_conditions: Conditions to AND together into the WHERE clause
+        params: Values for the %s placeholders in where_conditions
+        key_column: Unique, non-NULL source column to paginate on
+        chunk_rows: Page size; 0 fetches everything in one query
+    """
+    where_conditions = list(where_conditions or [])
+    params = list(params or [])
+    paginate = bool(key_column and chunk_rows > 0)
+    if paginate:
+        quoted_key = quote_wp_identifier(key_column)
+
+    last_key = None
+    while True:
+        conditions, page_params = where_conditions, params
+        if last_key is not None:
+            conditions = conditions + [f"{quoted_key} > %s"]
+            page_params = params + [last_key]
+
+        page_query = query
+        if conditions:
+            page_query += " WHERE " + " AND ".join(conditions)
+        if paginate:
+            page_query += f" ORDER BY {quoted_key} LIMIT {chunk_rows}"
+
+        rows = execute_wp_query(page_query, page_params) or []
+        page_size = len(rows)
+        if paginate and page_size:
+            last_key = rows[-1].get(key_column)
+            if last_key is None and page_size >= chunk_rows:
+                # Can't tell where the next page starts - stop rather than
+                # silently drop the remaining rows
+                frappe.throw(
+                    f"Cannot paginate on column '{key_column}': it is missing or NULL in the "
+                    "source rows. Check the Source Primary Key (names are case-sensitive) "
+                    "or set Rows per Query to 0."
+                )
+
+        rows.reverse()
+        while rows:
+            yield rows.pop()
+
+        if not paginate or page_size < chunk_rows:
+            break
+
+
+def _flush_sync_batch(task, pending, row_errors):
+    """
+    Write one batch of synced rows and commit.
+
+    WP Table Data is upserted with a single statement (see
+    _upsert_wp_table_data). For other DocTypes, existing records for the
+    batch's source ids are found with a single IN query; rows whose
+    track_row_hash matches the stored one only get track_last_synced bumped
+    (one UPDATE for all of them).
+
+    The rest are written in bulk when _can_bulk_write allows it: updates go
+    through a single CASE WHEN UPDATE per chunk and inserts get their names
+    up front (see _make_sync_names) and are written with one multi-row
+    INSERT. Otherwise - or if the bulk write fails, since one bad value
+    fails the whole statement - they are written row by row through
+    Documents and the failing rows are appended to row_errors. The pending
+    buffer is cleared.
+
+    Returns:
+        tuple: (rows inserted, rows updated, rows unchanged or failed)
+    """
+    if not pending:
+        return 0, 0, 0
+
+    doctype = task.target_doctype
+    if doctype == "WP Table Data":
+        inserted, updated = _upsert_wp_table_data(task, pending)
+        pending.clear()
+        frappe.db.commit()
+        return inserted, updated, 0
+
+    fields = ["name", "track_record_id"]
+    if frappe.get_meta(doctype).has_field("track_row_hash"):
+        fields.append("track_row_hash")
+    existing = {
+        str(rec.track_record_id): rec
+        for rec in frappe.get_all(
+            doctype,
+            filters={"track_record_id": ["in", list(pending)]},
+            fields=fields,
+            limit=0
+        )
+    }
+
+    to_update = {}  # {name: values}
+    update_ids = {}  # {name: source_id}
+    to_insert = {}  # {source_id: values}
+    unchanged = []  # names of records whose content hasn't changed
+    for source_id, values in pending.items():
+        existing_rec = existing.get(source_id)
+        if existing_rec:
+            if values.get("track_row_hash") and values["track_row_hash"] == existing_rec.get("track_row_hash"):
+                unchanged.append(existing_rec.name)
+                continue
+            to_update[existing_rec.name] = values
+            update_ids[existing_rec.name] = source_id
+        else:
+            values["track_record_id"] = source_id
+            to_insert[source_id] = values
+    # Unchanged rows were still seen by this sync - only bump their sync time
+    synced_at = next(iter(pending.values())).get("track_last_synced")
+    pending.clear()
+    if unchanged and synced_at:
+        frappe.db.sql(
+            "UPDATE `tab{0}` SET `track_last_synced` = %s WHERE `name` IN %s".format(doctype),
+            (synced_at, tuple(unchanged))
+        )
+
+    names = None
+    if _can_bulk_write(doctype):
+        frappe.db.savepoint(_BATCH_SAVEPOINT)
+        try:
+            names = _bulk_write_batch(task, to_update, to_insert)
+        except Exception:
+            frappe.db.rollback(save_point=_BATCH_SAVEPOINT)
+            names = None
+
+    if names is None:
+        inserted, updated, failed = _write_batch_rows(doctype, to_update, update_ids, to_insert, row_errors)
+    else:
+        inserted, updated, failed = len(to_insert), len(to_update), 0
+
+    frappe.db.commit()
+
+    return inserted, updated, len(unchanged) + failed
+
+
+def _can_bulk_write(doctype):
+    """
+    Whether synced rows of a DocType may be written with bulk SQL.
+
+    Bulk writes bypass the document layer: no controller methods or
+    doc_events, no validation or type casting, and no Version history even
+    when the DocType has track_changes. They are therefore limited to custom
+    DocTypes (no controller code - e.g. the mirrors created by
+    create_mirror_doctype) that have no DocType-specific doc_events and a
+    naming rule _make_sync_names supports. Everything else is written
+    through Documents.
+    """
+    meta = frappe.get_meta(doctype)
+    if not meta.custom or frappe.get_hooks("doc_events", {}).get(doctype):
+        return False
+    return _supported_autoname(meta.autoname) is not None
+
+
+def _bulk_write_batch(task, to_update, to_insert):
+    """
+    Write a batch's updates and inserts with bulk statements.
+
+    Returns:
+        list: Names given to the inserted rows, or None (nothing written)
+              when they can't be generated up front
+    """
+    doctype = task.target_doctype
+
+    names = []
+    if to_insert:
+        names = _make_sync_names(task, len(to_insert))
+        if names is None:
+            return None
+
+    if to_update:
+        frappe.db.bulk_update(doctype, to_update, chunk_size=100)
+
+    if to_insert:
+        now = now_datetime()
+        user = frappe.session.user
+        defaults = _get_insert_defaults(doctype)
+        # Column order is fixed per batch; each row becomes a tuple
+        # directly, with defaults filling fields the row doesn't set
+        columns = tuple((f, defaults.get(f)) for f in sorted(set(defaults).union(*to_insert.values())))
+        fields = [f for f, _ in columns]
+        values = [
+            (name, now, now, user, user, *(row_values.get(f, default) for f, default in columns))
+            for row_values, name in zip(to_insert.values(), names)
+        ]
+        frappe.db.bulk_insert(
+            doctype,
+            fields=["name", "creation", "modified", "owner", "modified_by"] + fields,
+            values=values
+        )
+
+    return names
+
+
+def _write_batch_rows(doctype, to_update, update_ids, to_insert, row_errors):
+    """
+    Write a batch one row at a time through Documents, each under a savepoint.
+
+    Used for DocTypes that can't be bulk-written and when the bulk write of
+    a batch fails; Frappe's casting, validation, hooks and Version history
+    apply and only the failing rows are lost.
+
+    Returns:
+        tuple: (rows inserted, rows updated, rows failed)
+    """
+    inserted = updated = failed = 0
+
+    for name, values in to_update.items():
+        frappe.db.savepoint(_ROW_SAVEPOINT)
+        try:
+            doc = frappe.get_doc(doctype, name)
+            doc.update(values)
+            doc.save(ignore_permissions=True)
+            updated += 1
+        except Exception as e:
+            frappe.db.rollback(save_point=_ROW_SAVEPOINT)
+            row_errors.append({"source_id": update_ids[name], "error": str(e)[:200]})
+            failed += 1
+
+    for source_id, values in to_insert.items():
+        frappe.db.savepoint(_ROW_SAVEPOINT)
+        try:
+            frappe.get_doc({"doctype": doctype, **values}).insert(ignore_permissions=True)
+            inserted += 1
+        except Exception as e:
+            frappe.db.rollback(save_point=_ROW_SAVEPOINT)
+            row_errors.append({"source_id": source_id, "error": str(e)[:200]})
+            failed += 1
+
+    return inserted, updated, failed
+
+
+def _supported_autoname(autoname):
+    """
+    Parse the naming rules _make_sync_names can apply without a Document.
+
+    Only hash names and single-part naming series ("PREFIX-.#####", as
+    created by create_mirror_doctype) are supported. Series with more parts
+    ("SO-.YYYY.-.#####") or placeholders are parsed by frappe.model.naming
+    into a different tabSeries key, so they aren't.
+
+    Returns:
+        tuple: ("hash", None) or ("series", (prefix, digits)); None when the
+               rule isn't supported
+    """
+    if not autoname or autoname == "hash":
+        return "hash", None
+
+    prefix, dot, digits = autoname.rpartition(".")
+    if not dot or not prefix or not digits or digits.strip("#"):
+        return None
+    if "." in prefix or "{" in prefix or ":" in prefix:
+        return None
+    return "series", (prefix, len(digits))
+
+
+def _make_sync_names(task, count):
+    """
+    Generate document names for new synced rows without a Document per row.
+
+    A naming series is reserved as one block of count numbers in tabSeries.
+    Returns None for naming rules _supported_autoname doesn't handle.
+    """
+    rule = _supported_autoname(frappe.get_meta(task.target_doctype).autoname)
+    if rule is None:
+        return None
+
+    kind, series = rule
+    if kind == "hash":
+        return [frappe.generate_hash(length=10) for _ in range(count)]
+
+    prefix, width = series
+    current = frappe.db.sql(
+        "SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", (prefix,)
+    )
+    if current:
+        start = cint(current[0][0])
+        frappe.db.sql(
+            "UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s", (start + count, prefix)
+        )
+    else:
+        start = 0
+        frappe.db.sql(
+            "INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count)
+        )
+
+    return [f"{prefix}{str(n).zfill(width)}" for n in range(start + 1, start + count + 1)]
+
+
+def _upsert_wp_table_data(task, pending):
+    """
+    Write a batch of rows to WP Table Data with one INSERT ... ON DUPLICATE KEY UPDATE.
+
+    WP Table Data is named "{table_name}-{record_id}", so the primary key is
+    known without a lookup and existing rows are updated in place. MySQL
+    reports 1 affected row per insert and 2 per update, which gives the
+    counts (synced_at always changes, so no update is a no-op).
+
+    Returns:
+        tuple: (rows inserted, rows updated)
+    """
+    now = now_datetime()
+    user = frappe.session.user
+    table = task.source_table
+
+    placeholders = []
+    params = []
+    for source_id, values in pending.items():
+        placeholders.append("(%s, %s, %s, %s, %s, %s, %s, %s, %s)")
+        params.extend((
+            f"{table}-{source_id}", table, source_id, values["data"], values["synced_at"],
+            now, now, user, user
+        ))
+
+    frappe.db.sql(
+        """
+        INSERT INTO `tabWP Table Data`
+            (name, table_name, record_id, data, synced_at, creation, modified, owner, modified_by)
+        VALUES {0}
+        ON DUPLICATE KEY UPDATE
+            data = VALUES(data),
+            synced_at = VALUES(synced_at),
+            modified = VALUES(modified),
+            modified_by = VALUES(modified_by)
+        """.format(", ".join(placeholders)),
+        params
+    )
+
+    affected = cint(frappe.db.sql("SELECT ROW_COUNT()")[0][0])
+    updated = max(affected - len(pending), 0)
+    return len(pending) - updated, updated
+
+
+def _get_writable_columns(doctype):
+    """Columns of a DocType that synced values may be written to (no standard fields)."""
+    return frozenset(frappe.get_meta(doctype).get_valid_columns()) - frozenset(default_fields)
+
+
+# Fieldtypes stored in NOT NULL numeric columns
+_NUMERIC_FIELDTYPES = frozenset({"Int", "Check", "Float", "Currency", "Percent"})
+
+
+def _get_insert_defaults(doctype):
+    """
+    Column defaults a Document insert would apply, for bulk-inserted rows.
+
+    Taken from frappe.new_doc, so static and dynamic defaults ("__user",
+    "Today", session defaults) resolve exactly as for a Document. Numeric
+    fields without a default get 0, as their NOT NULL columns require.
+    """
+    writable = _get_writable_columns(doctype)
+    new_doc = frappe.new_doc(doctype)
+    defaults = {}
+    for df in frappe.get_meta(doctype).fields:
+        if df.fieldname not in writable:
+            continue
+        value = new_doc.get(df.fieldname)
+        if value is None and df.fieldtype in _NUMERIC_FIELDTYPES:
+            value = 0
+        if value is not None:
+            defaults[df.fieldname] = value
+    return defaults
+
+
 def sync_frappe_to_wp(task):
     """
     Sync data from Frappe DocType to WordPress table.
@@ -402,17 +960,14 @@ def cleanup_old_logs():
 
     cutoff_date = add_days(now_datetime(), -30)
 
-    old_logs = frappe.get_all(
-        "WP Sync Log",
-        filters={"started_at": ["<", cutoff_date]},
-        fields=["name"]
-    )
-
-    for log in old_logs:
-        frappe.delete_doc("WP Sync Log", log.name, ignore_permissions=True)
+    # WP Sync Log has no child tables or delete hooks, so one DELETE is enough
+    filters = {"started_at": ["<", cutoff_date]}
+    deleted = frappe.db.count("WP Sync Log", filters)
+    if deleted:
+        frappe.db.delete("WP Sync Log", filters)
 
     frappe.db.commit()
 
-    if old_logs:
-        frappe.logger().info(f"WP Sync: Cleaned up {len(old_logs)} old log entries")
+    if deleted:
+        frappe.logger().info(f"WP Sync: Cleaned up {deleted} old log entries")
 
@@ -0,0 +1,51 @@
+# Copyright (c) 2025, NCE and contributors
+# For license information, please see license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from nce.wp_sync.api import get_enum_options, mysql_type_to_frappe_fieldtype
+
+
+class TestMysqlTypeMapping(FrappeTestCase):
+    """mysql_type_to_frappe_fieldtype / get_enum_options"""
+
+    def test_fieldtypes(self):
+        for mysql_type, fieldtype in (
+            (None, "Data"),
+            ("", "Data"),
+            ("tinyint(1)", "Check"),
+            ("TINYINT(1)", "Check"),
+            ("tinyint(4)", "Int"),
+            ("int(11)", "Int"),
+            ("int(10) unsigned", "Int"),
+            ("bigint(20) unsigned", "Int"),
+            ("decimal(10,2)", "Float"),
+            ("double", "Float"),
+            ("varchar(140)", "Data"),
+            ("varchar(255)", "Small Text"),
+            ("char(36)", "Data"),
+            ("text", "Text"),
+            ("longtext", "Text"),
+            ("tinytext", "Small Text"),
+            ("date", "Date"),
+            ("datetime", "Datetime"),
+            ("timestamp", "Datetime"),
+            ("time", "Time"),
+            ("json", "JSON"),
+            ("enum('a','b')", "Select"),
+            ("set('a','b')", "Select"),
+            ("longblob", "Text"),
+            ("geometry", "Data"),
+        ):
+            with self.subTest(mysql_type=mysql_type):
+                self.assertEqual(mysql_type_to_frappe_fieldtype(mysql_type), fieldtype)
+
+    def test_enum_options(self):
+        self.assertEqual(get_enum_options("enum('active','inactive','pending')"), "active\ninactive\npending")
+        self.assertEqual(get_enum_options("ENUM('yes', 'no')"), "yes\nno")
+        self.assertEqual(get_enum_options('enum("a","b")'), "a\nb")
+
+    def test_enum_options_not_enum(self):
+        for mysql_type in (None, "", "enum()", "enum", "varchar(20)", "set('a','b')", "enumx('a')"):
+            with self.subTest(mysql_type=mysql_type):
+                self.assertEqual(get_enum_options(mysql_type), "")
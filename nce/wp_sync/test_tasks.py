@@ -0,0 +1,166 @@
+# Copyright (c) 2025, NCE and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nce.wp_sync import tasks
+
+
+def _meta(autoname):
+    return frappe._dict(autoname=autoname)
+
+
+class TestSyncNames(FrappeTestCase):
+    """_supported_autoname / _make_sync_names: names generated for bulk inserts"""
+
+    task = frappe._dict(target_doctype="WP Test Mirror")
+
+    def test_supported_autonames(self):
+        self.assertEqual(tasks._supported_autoname(None), ("hash", None))
+        self.assertEqual(tasks._supported_autoname("hash"), ("hash", None))
+        self.assertEqual(tasks._supported_autoname("Sync_Users-.#####"), ("series", ("Sync_Users-", 5)))
+
+    def test_unsupported_autonames(self):
+        for autoname in (
+            "SO-.YYYY.-.#####",         # multi-part series
+            "Task.v2-.#####",           # dot in the prefix
+            "INV-{customer}-.####",     # placeholder
+            "naming_series:",
+            "field:email",
+            "format:{table_name}-{record_id}",
+            "prompt",
+            "PREFIX-.##x#",
+        ):
+            with self.subTest(autoname=autoname):
+                self.assertIsNone(tasks._supported_autoname(autoname))
+
+    def test_hash_names(self):
+        with patch.object(frappe, "get_meta", return_value=_meta("hash")):
+            names = tasks._make_sync_names(self.task, 3)
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+        self.assertTrue(all(len(name) == 10 for name in names))
+
+    def test_new_series_is_created(self):
+        with patch.object(frappe, "get_meta", return_value=_meta("WP-.#####")), \
+                patch.object(frappe.db, "sql", side_effect=[(), None]) as sql:
+            names = tasks._make_sync_names(self.task, 3)
+        self.assertEqual(names, ["WP-00001", "WP-00002", "WP-00003"])
+        self.assertIn("INSERT INTO `tabSeries`", sql.call_args_list[1][0][0])
+        self.assertEqual(sql.call_args_list[1][0][1], ("WP-", 3))
+
+    def test_existing_series_reserves_a_block(self):
+        with patch.object(frappe, "get_meta", return_value=_meta("WP-.###")), \
+                patch.object(frappe.db, "sql", side_effect=[((7,),), None]) as sql:
+            names = tasks._make_sync_names(self.task, 2)
+        self.assertEqual(names, ["WP-008", "WP-009"])
+        self.assertIn("FOR UPDATE", sql.call_args_list[0][0][0])
+        self.assertEqual(sql.call_args_list[1][0][1], (9, "WP-"))
+
+    def test_unsupported_series_is_left_alone(self):
+        with patch.object(frappe, "get_meta", return_value=_meta("SO-.YYYY.-.#####")), \
+                patch.object(frappe.db, "sql") as sql:
+            self.assertIsNone(tasks._make_sync_names(self.task, 2))
+        sql.assert_not_called()
+
+
+class TestInsertDefaults(FrappeTestCase):
+    """_get_insert_defaults: defaults taken from frappe.new_doc"""
+
+    def test_defaults(self):
+        meta = frappe._dict(fields=[
+            frappe._dict(fieldname="status", fieldtype="Data"),
+            frappe._dict(fieldname="owner_email", fieldtype="Data"),
+            frappe._dict(fieldname="qty", fieldtype="Int"),
+            frappe._dict(fieldname="amount", fieldtype="Currency"),
+            frappe._dict(fieldname="notes", fieldtype="Text"),
+            frappe._dict(fieldname="section", fieldtype="Section Break"),
+        ])
+        new_doc = frappe._dict(status="Open", owner_email="test@example.com", amount=2.5)
+        with patch.object(frappe, "get_meta", return_value=meta), \
+                patch.object(frappe, "new_doc", return_value=new_doc), \
+                patch.object(tasks, "_get_writable_columns",
+                             return_value=frozenset({"status", "owner_email", "qty", "amount", "notes"})):
+            defaults = tasks._get_insert_defaults("WP Test Mirror")
+
+        self.assertEqual(defaults, {
+            "status": "Open",
+            "owner_email": "test@example.com",
+            "qty": 0,         # NOT NULL numeric column without a default
+            "amount": 2.5,
+        })
+
+
+class TestIterWpRows(FrappeTestCase):
+    """iter_wp_rows: single query and keyset pagination"""
+
+    def test_single_query(self):
+        rows = [{"id": 1}, {"id": 2}, {"id": 3}]
+        with patch.object(tasks, "execute_wp_query", return_value=list(rows)) as query:
+            result = list(tasks.iter_wp_rows("SELECT * FROM `t`", ["(`a` = %s)"], [1]))
+        self.assertEqual(result, rows)
+        query.assert_called_once_with("SELECT * FROM `t` WHERE (`a` = %s)", [1])
+
+    def test_keyset_pagination(self):
+        pages = [
+            [{"id": 1}, {"id": 2}],
+            [{"id": 3}, {"id": 4}],
+            [{"id": 5}],
+        ]
+        with patch.object(tasks, "execute_wp_query", side_effect=pages) as query:
+            result = list(tasks.iter_wp_rows("SELECT * FROM `t`", key_column="id", chunk_rows=2))
+
+        self.assertEqual([row["id"] for row in result], [1, 2, 3, 4, 5])
+        self.assertEqual(query.call_count, 3)
+        self.assertEqual(query.call_args_list[0][0], ("SELECT * FROM `t` ORDER BY `id` LIMIT 2", []))
+        self.assertEqual(
+            query.call_args_list[1][0],
+            ("SELECT * FROM `t` WHERE `id` > %s ORDER BY `id` LIMIT 2", [2])
+        )
+        self.assertEqual(
+            query.call_args_list[2][0],
+            ("SELECT * FROM `t` WHERE `id` > %s ORDER BY `id` LIMIT 2", [4])
+        )
+
+    def test_pagination_keeps_where_conditions(self):
+        pages = [[{"id": 1}, {"id": 2}], []]
+        with patch.object(tasks, "execute_wp_query", side_effect=pages) as query:
+            list(tasks.iter_wp_rows("SELECT * FROM `t`", ["(`a` = %s)"], ["x"], "id", 2))
+        self.assertEqual(
+            query.call_args_list[1][0],
+            ("SELECT * FROM `t` WHERE (`a` = %s) AND `id` > %s ORDER BY `id` LIMIT 2", ["x", 2])
+        )
+
+    def test_full_page_without_key_throws(self):
+        pages = [[{"id": 1}, {"ID": 2}]]
+        with patch.object(tasks, "execute_wp_query", side_effect=pages):
+            with self.assertRaises(frappe.ValidationError):
+                list(tasks.iter_wp_rows("SELECT * FROM `t`", key_column="id", chunk_rows=2))
+
+    def test_partial_page_without_key_ends(self):
+        pages = [[{"id": None}]]
+        with patch.object(tasks, "execute_wp_query", side_effect=pages) as query:
+            result = list(tasks.iter_wp_rows("SELECT * FROM `t`", key_column="id", chunk_rows=2))
+        self.assertEqual(result, [{"id": None}])
+        query.assert_called_once()
+
+
+class TestGroupTasksByTarget(FrappeTestCase):
+    def test_groups_keep_order(self):
+        tasks_list = [
+            frappe._dict(name="a", target_doctype="X"),
+            frappe._dict(name="b", target_doctype="Y"),
+            frappe._dict(name="c", target_doctype="X"),
+            frappe._dict(name="d", target_doctype="WP Table Data"),
+            frappe._dict(name="e", target_doctype="Y"),
+        ]
+        self.assertEqual(
+            tasks.group_tasks_by_target(tasks_list),
+            [["a", "c"], ["b", "e"], ["d"]]
+        )
+
+    def test_empty(self):
+        self.assertEqual(tasks.group_tasks_by_target([]), [])
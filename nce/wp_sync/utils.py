@@ -0,0 +1,38 @@
+"""
+Shared helpers for the WP Sync module.
+
+JSON encoding/decoding goes through orjson when it is available (Frappe v15+
+ships it) and falls back to the stdlib json module otherwise. orjson's
+JSONDecodeError subclasses json.JSONDecodeError, so callers keep catching
+json.JSONDecodeError either way.
+"""
+
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the bench environment
+    orjson = None
+
+
+def json_dumps(obj, indent=False, sort_keys=False):
+    """Serialize obj to a str. indent=True pretty-prints with 2 spaces."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+    return json.dumps(obj, default=str, indent=2 if indent else None, sort_keys=sort_keys)
+
+
+def row_hash(values):
+    """16-char content hash of a dict, independent of key order."""
+    return hashlib.blake2b(json_dumps(values, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def json_loads(s):
+    """Deserialize a JSON str or bytes."""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)